@@ -1,71 +1,77 @@
 import pandas as pd
 import numpy as np
-from scipy import stats
 
-# Sample purchase data (replace with your actual data)
-purchase_data = {
-    'CustomerID': range(1, 101),  # 100 customers
-    'PurchaseAmount': np.concatenate([
-        np.random.normal(50, 15, 80),  # Most customers spend around 50
-        np.random.normal(200, 50, 10), # Some high spenders
-        np.random.normal(10, 5, 10)   # Few very low spenders
-    ])
-}
+import datasets
+from instrumentation import stage
+from mode_estimator import StreamingMode
+from outlier_index import IQROutlierIndex
+import schema
+import storage
 
-df = pd.DataFrame(purchase_data)
 
-# Save to CSV
-df.to_csv('customer_purchases.csv', index=False)
+def main(plot_mode=None):
+    """Run the customer purchase analysis and print its report."""
+    # Sample purchase data (replace with your actual data)
+    with stage('load', 'customer') as load:
+        df = datasets.customer_purchases(100)  # 100 customers: mostly ~50, some high and a few very low spenders
 
-# Load from CSV (for demonstration)
-df = pd.read_csv('customer_purchases.csv')
+        # Save to the columnar cache (see storage.py), with a CSV export
+        storage.save_dataset(df, 'customer_purchases', csv_path='customer_purchases.csv')
 
-# --- Analysis ---
-mean_purchase = df['PurchaseAmount'].mean()
-median_purchase = df['PurchaseAmount'].median()
+        # Load from the cache (memory-mapped, no parsing), in compact dtypes (see schema.py)
+        df = schema.apply_schema(storage.load_dataset('customer_purchases'), 'customer_purchases')
+        load.update(rows=len(df))
 
-# Improved mode handling
-try:
-    mode_purchase = stats.mode(df['PurchaseAmount'])[0][0]  # Try to get the first mode
-except IndexError:
-    # If there's no mode (tie for most frequent values), print a message
-    print("There is no single most frequent purchase amount (multiple modes).")
-    mode_purchase = None  # Set mode to None to indicate no unique mode
+    # --- Analysis ---
+    with stage('statistics', 'customer', rows=len(df)):
+        mean_purchase = df['PurchaseAmount'].mean()
+        median_purchase = df['PurchaseAmount'].median()
 
-std_dev_purchase = df['PurchaseAmount'].std()
+        # Mode of a continuous amount: peak of the $5-bin histogram (see mode_estimator.py),
+        # since exact values almost never repeat
+        mode_purchase = StreamingMode.from_values(df['PurchaseAmount'], bin_width=5).mode()
 
-print(f"Mean Purchase Amount: {mean_purchase:.2f}")
-print(f"Median Purchase Amount: {median_purchase:.2f}")
-print(f"Mode Purchase Amount: {mode_purchase:.2f}" if mode_purchase else "No single mode found.")
-print(f"Standard Deviation of Purchase Amounts: {std_dev_purchase:.2f}")
+        std_dev_purchase = df['PurchaseAmount'].std()
 
-# --- Outlier Identification (using IQR) ---
-Q1 = df['PurchaseAmount'].quantile(0.25)
-Q3 = df['PurchaseAmount'].quantile(0.75)
-IQR = Q3 - Q1
-outliers = df[(df['PurchaseAmount'] < (Q1 - 1.5 * IQR)) | (df['PurchaseAmount'] > (Q3 + 1.5 * IQR))]
+        print(f"Mean Purchase Amount: {mean_purchase:.2f}")
+        print(f"Median Purchase Amount: {median_purchase:.2f}")
+        print(f"Mode Purchase Amount: {mode_purchase:.2f}" if mode_purchase is not None else "No single mode found.")
+        print(f"Standard Deviation of Purchase Amounts: {std_dev_purchase:.2f}")
 
-print(f"\nNumber of Outliers: {len(outliers)}")
-print("\nOutliers:")
-print(outliers)
+    # --- Outlier Identification (using IQR) ---
+    # The index keeps the amounts sorted, so later purchase batches can be added with
+    # update() and the outliers re-read without rescanning the table (see outlier_index.py)
+    with stage('outliers', 'customer', rows=len(df)):
+        outlier_index = IQROutlierIndex(k=1.5)
+        outlier_index.update(df['PurchaseAmount'], df.index)
+        outliers = df.loc[np.sort(outlier_index.outlier_keys())]
 
-# --- Spending Categories ---
-df['SpendingCategory'] = pd.cut(df['PurchaseAmount'],
-                                bins=[0, 30, 70, 100, float('inf')],
-                                labels=['Low Spender', 'Moderate Spender', 'High Spender', 'Very High Spender'])
+        print(f"\nNumber of Outliers: {len(outliers)}")
+        print("\nOutliers:")
+        print(outliers)
 
-print("\nSpending Categories:")
-print(df['SpendingCategory'].value_counts())
+    # --- Spending Categories ---
+    with stage('categories', 'customer', rows=len(df)):
+        df['SpendingCategory'] = pd.cut(df['PurchaseAmount'],
+                                        bins=[0, 30, 70, 100, float('inf')],
+                                        labels=['Low Spender', 'Moderate Spender', 'High Spender', 'Very High Spender'])
 
-# --- Answers to Questions ---
+        print("\nSpending Categories:")
+        print(df['SpendingCategory'].value_counts())
 
-print("\n--- Answers to Questions ---")
+    # --- Answers to Questions ---
 
-print("1. Why might the mean purchase amount be significantly different from the median?")
-print("   - The mean is sensitive to extreme values (outliers). If there are a few very large purchases, they will pull the mean upwards, while the median (the middle value) is not affected as much. In our example, the presence of few high spenders and few very low spenders is causing the mean to be higher than the median.")
+    print("\n--- Answers to Questions ---")
 
-print("\n2. How would outliers affect each measure of central tendency?")
-print("   - Mean: Significantly affected; outliers pull the mean towards their value.\n   - Median: Less affected; outliers have minimal impact if they are not numerous enough to change the middle position.\n   - Mode: Not directly affected; outliers do not change the most frequent value unless they themselves become the most frequent value (which is unlikely).")
+    print("1. Why might the mean purchase amount be significantly different from the median?")
+    print("   - The mean is sensitive to extreme values (outliers). If there are a few very large purchases, they will pull the mean upwards, while the median (the middle value) is not affected as much. In our example, the presence of few high spenders and few very low spenders is causing the mean to be higher than the median.")
 
-print("\n3. What insights can standard deviation provide about customer spending patterns?")
-print("   - Standard deviation measures the spread or dispersion of the data. A high standard deviation indicates that purchase amounts are widely spread out (high variability in spending), while a low standard deviation indicates that most purchases are close to the mean (consistent spending). In our example, a relatively high standard deviation shows that there's considerable variation in customer spending.")
\ No newline at end of file
+    print("\n2. How would outliers affect each measure of central tendency?")
+    print("   - Mean: Significantly affected; outliers pull the mean towards their value.\n   - Median: Less affected; outliers have minimal impact if they are not numerous enough to change the middle position.\n   - Mode: Not directly affected; outliers do not change the most frequent value unless they themselves become the most frequent value (which is unlikely).")
+
+    print("\n3. What insights can standard deviation provide about customer spending patterns?")
+    print("   - Standard deviation measures the spread or dispersion of the data. A high standard deviation indicates that purchase amounts are widely spread out (high variability in spending), while a low standard deviation indicates that most purchases are close to the mean (consistent spending). In our example, a relatively high standard deviation shows that there's considerable variation in customer spending.")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,88 +1,97 @@
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
-from scipy import stats
-
-# Sample wait time data (replace with your actual data)
-np.random.seed(42)  # for reproducibility
-num_patients = 500
-wait_times = np.concatenate([
-    np.random.exponential(15, 400),  # Most patients have shorter waits (exponential distribution)
-    np.random.normal(60, 20, 100)  # Some patients have longer waits (normal distribution, representing more complex cases)
-])
-wait_times = np.clip(wait_times, 0, 200) # Ensure no negative wait times and cap at 200 minutes
-arrival_times = pd.to_datetime(['2024-01-01 00:00:00'] * num_patients) + pd.to_timedelta(np.random.randint(0, 365*24*60, num_patients), unit='m') #random arrival times
-
-df = pd.DataFrame({'WaitTime': wait_times, 'ArrivalTime': arrival_times})
-
-# Add Emergency Severity (simulated)
-emergency_types = ['Minor', 'Moderate', 'Severe']
-df['EmergencyType'] = np.random.choice(emergency_types, num_patients, p=[0.6, 0.3, 0.1]) #Simulate more minor cases
-
-# Save to CSV
-df.to_csv('hospital_wait_times.csv', index=False)
-
-# Load from CSV
-df = pd.read_csv('hospital_wait_times.csv', parse_dates=['ArrivalTime'])
-
-# --- Analysis ---
-print("\n--- Overall Wait Time Analysis ---")
-
-mean_wait = df['WaitTime'].mean()
-median_wait = df['WaitTime'].median()
-try:
-    mode_wait = stats.mode(df['WaitTime'])[0][0]
-except IndexError:
-    mode_wait = None
-std_dev_wait = df['WaitTime'].std()
-
-print(f"Mean Wait Time: {mean_wait:.2f} minutes")
-print(f"Median Wait Time: {median_wait:.2f} minutes")
-print(f"Mode Wait Time: {mode_wait:.2f}" if mode_wait is not None else "No unique mode found")
-print(f"Standard Deviation of Wait Times: {std_dev_wait:.2f} minutes")
-
-# Percentiles
-percentiles = [25, 50, 75, 90, 95, 99]
-for p in percentiles:
-    print(f"{p}th Percentile Wait Time: {np.percentile(df['WaitTime'], p):.2f} minutes")
-
-# Peak Hours Analysis
-df['HourOfDay'] = df['ArrivalTime'].dt.hour
-peak_hours = df['HourOfDay'].value_counts().sort_index()
-print("\nPeak Hours:")
-print(peak_hours)
-
-plt.figure(figsize=(10, 6))
-sns.countplot(x='HourOfDay', data=df)
-plt.title("Patient Arrivals by Hour of Day")
-plt.xlabel("Hour of Day")
-plt.ylabel("Number of Patients")
-plt.show()
-
-# Wait times by emergency type:
-print("\nWait Times by Emergency Type:")
-print(df.groupby('EmergencyType')['WaitTime'].describe())
-
-plt.figure(figsize=(8, 6))
-sns.boxplot(x='EmergencyType', y='WaitTime', data=df)
-plt.title("Wait Times by Emergency Type")
-plt.show()
-
-# --- Answers to Key Considerations ---
-print("\n--- Answers to Key Considerations ---")
-
-print("1. Why might median wait time be more useful than mean?")
-print("   - Wait times are often skewed (some patients have very long waits). The mean is sensitive to these extreme values, while the median (the middle value) is not. The median gives a better representation of the 'typical' wait time experienced by most patients.")
-
-print("\n2. How can percentiles help in setting service level agreements?")
-print("   - Percentiles can be used to define service level targets. For example:\n"
-      "     - '90% of patients will be seen within X minutes' (using the 90th percentile).\n"
-      "     - '99% of patients will be seen within Y minutes' (using the 99th percentile).\n"
-      "   This allows the hospital to set targets based on different levels of urgency and allocate resources accordingly.")
-
-print("\n3. What does the standard deviation of wait times indicate about service consistency?")
-print("   - A high standard deviation indicates high variability in wait times, meaning the service is inconsistent. Some patients wait much longer than others. A low standard deviation indicates more consistent wait times.")
-
-print("\n4. How would you identify and account for different types of emergencies?")
-print("   - Categorize emergencies by severity (e.g., minor, moderate, severe). Analyze wait times separately for each category. This allows you to identify if certain types of emergencies are experiencing disproportionately long waits. Different service level targets can be set for different emergency types (e.g., shorter wait times for severe emergencies). This is demonstrated in the code using simulated emergency types.")
\ No newline at end of file
+
+import datasets
+from instrumentation import stage
+import plots
+from plot_renderer import PlotRenderer
+from mode_estimator import StreamingMode
+from quantile_sketch import KLLSketch
+from rollup_store import WaitTimeRollup
+import schema
+import storage
+
+
+def main(plot_mode=None):
+    """Run the hospital wait time analysis and print its report."""
+    # Sample wait time data (replace with your actual data)
+    np.random.seed(42)  # for reproducibility
+    num_patients = 500
+    plot_renderer = PlotRenderer(plot_mode, analysis='hospital')  # 'show', 'save' (headless, in parallel) or 'skip'; see plot_renderer.py
+    # Exponential short waits plus normally distributed longer (complex) cases, random
+    # arrival times over a year and simulated severity (mostly minor cases)
+    with stage('load', 'hospital') as load:
+        df = datasets.hospital_wait_times(num_patients)
+        emergency_types = datasets.EMERGENCY_TYPES
+
+        # Save to the columnar cache (see storage.py), with a CSV export
+        storage.save_dataset(df, 'hospital_wait_times', csv_path='hospital_wait_times.csv')
+
+        # Load from the cache (memory-mapped, no parsing), in compact dtypes (see schema.py)
+        df = schema.apply_schema(storage.load_dataset('hospital_wait_times'), 'hospital_wait_times')
+        load.update(rows=len(df))
+
+    # --- Analysis ---
+    print("\n--- Overall Wait Time Analysis ---")
+
+    with stage('statistics', 'hospital', rows=len(df)):
+        mean_wait = df['WaitTime'].mean()
+        median_wait = df['WaitTime'].median()
+        mode_wait = StreamingMode.from_values(df['WaitTime'], bin_width=2).mode()  # peak of the 2-minute-bin histogram
+        std_dev_wait = df['WaitTime'].std()
+
+        print(f"Mean Wait Time: {mean_wait:.2f} minutes")
+        print(f"Median Wait Time: {median_wait:.2f} minutes")
+        print(f"Mode Wait Time: {mode_wait:.2f}" if mode_wait is not None else "No unique mode found")
+        print(f"Standard Deviation of Wait Times: {std_dev_wait:.2f} minutes")
+
+        # Percentiles
+        percentiles = [25, 50, 75, 90, 95, 99]
+        wait_sketch = KLLSketch.from_values(df['WaitTime'])  # one pass for all percentiles
+        for p, value in zip(percentiles, wait_sketch.percentiles(percentiles)):
+            print(f"{p}th Percentile Wait Time: {value:.2f} minutes")
+
+    # Hourly rollup per emergency type (see rollup_store.py). Peak-hour and severity
+    # questions are answered from it without rescanning rows; new arrivals can be
+    # added with WaitTimeRollup.load('hospital_rollup').append(new_rows) and save()
+    with stage('rollup', 'hospital', rows=len(df)):
+        rollup = WaitTimeRollup()
+        rollup.append(df)
+        rollup.save('hospital_rollup')
+
+        # Peak Hours Analysis
+        peak_hours = rollup.peak_hours()
+        print("\nPeak Hours:")
+        print(peak_hours)
+
+        plot_renderer.submit('arrivals_by_hour', plots.arrivals_by_hour, peak_hours, figsize=(10, 6))
+
+        # Wait times by emergency type (percentiles within 1% of the exact values):
+        print("\nWait Times by Emergency Type:")
+        print(rollup.describe('EmergencyType'))
+
+    plot_renderer.submit('wait_time_by_emergency_type', plots.wait_time_by_emergency_type,
+                         df[['EmergencyType', 'WaitTime']], figsize=(8, 6))
+    plot_renderer.close()
+
+    # --- Answers to Key Considerations ---
+    print("\n--- Answers to Key Considerations ---")
+
+    print("1. Why might median wait time be more useful than mean?")
+    print("   - Wait times are often skewed (some patients have very long waits). The mean is sensitive to these extreme values, while the median (the middle value) is not. The median gives a better representation of the 'typical' wait time experienced by most patients.")
+
+    print("\n2. How can percentiles help in setting service level agreements?")
+    print("   - Percentiles can be used to define service level targets. For example:\n"
+          "     - '90% of patients will be seen within X minutes' (using the 90th percentile).\n"
+          "     - '99% of patients will be seen within Y minutes' (using the 99th percentile).\n"
+          "   This allows the hospital to set targets based on different levels of urgency and allocate resources accordingly.")
+
+    print("\n3. What does the standard deviation of wait times indicate about service consistency?")
+    print("   - A high standard deviation indicates high variability in wait times, meaning the service is inconsistent. Some patients wait much longer than others. A low standard deviation indicates more consistent wait times.")
+
+    print("\n4. How would you identify and account for different types of emergencies?")
+    print("   - Categorize emergencies by severity (e.g., minor, moderate, severe). Analyze wait times separately for each category. This allows you to identify if certain types of emergencies are experiencing disproportionately long waits. Different service level targets can be set for different emergency types (e.g., shorter wait times for severe emergencies). This is demonstrated in the code using simulated emergency types.")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,92 +1,137 @@
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
-import scipy.stats as stats
-
-# Sample manufacturing data (replace with your actual data)
-np.random.seed(42)  # for reproducibility
-num_parts = 200
-target_dimension = 50  # Example target dimension (e.g., length in mm)
-std_dev_normal = 2
-part_data = {
-    'PartID': range(1, num_parts + 1),
-    'Dimension': np.random.normal(target_dimension, std_dev_normal, num_parts)
-}
-df = pd.DataFrame(part_data)
-
-# Simulate a systematic error (shift in mean) for some parts:
-systematic_error_start = 150
-df.loc[systematic_error_start:, 'Dimension'] += 3  # Shift the mean for the last 50 parts
-
-# Save to CSV
-df.to_csv('manufacturing_parts.csv', index=False)
-
-# Load from CSV
-df = pd.read_csv('manufacturing_parts.csv')
-
-
-# --- Analysis ---
-print("\n--- Overall Analysis ---")
-
-mean_dimension = df['Dimension'].mean()
-std_dev_dimension = df['Dimension'].std()
-
-print(f"Mean Dimension: {mean_dimension:.2f}")
-print(f"Standard Deviation of Dimension: {std_dev_dimension:.2f}")
-
-# Percentiles
-percentiles = [5, 25, 50, 75, 95]
-for p in percentiles:
-    print(f"{p}th Percentile: {np.percentile(df['Dimension'], p):.2f}")
-
-# Distribution Visualization
-plt.figure(figsize=(10, 6))
-sns.histplot(df['Dimension'], kde=True)
-plt.title("Distribution of Part Dimensions")
-plt.xlabel("Dimension")
-plt.ylabel("Frequency")
-plt.show()
-
-# Normality test
-stat, p = stats.shapiro(df['Dimension'])
-print(f"Shapiro-Wilk Test: Statistics={stat:.3f}, p={p:.3f}")
-alpha = 0.05
-if p > alpha:
-    print('Sample looks Gaussian (fail to reject H0)')
-else:
-    print('Sample does not look Gaussian (reject H0)')
-
-# --- Analysis before and after the systematic shift ---
-df_before = df[df['PartID'] < systematic_error_start]
-df_after = df[df['PartID'] >= systematic_error_start]
-
-print("\n--- Analysis Before Systematic Error ---")
-print(f"Mean Dimension: {df_before['Dimension'].mean():.2f}")
-print(f"Standard Deviation of Dimension: {df_before['Dimension'].std():.2f}")
-
-print("\n--- Analysis After Systematic Error ---")
-print(f"Mean Dimension: {df_after['Dimension'].mean():.2f}")
-print(f"Standard Deviation of Dimension: {df_after['Dimension'].std():.2f}")
-
-
-# --- Answers to Investigation Areas ---
-print("\n--- Answers to Investigation Areas ---")
-
-print("1. How can standard deviation help in setting quality control limits?")
-print("   - Quality control limits are often set based on standard deviations from the mean. For example:\n"
-      "     - +/- 3 standard deviations: This captures about 99.7% of the data in a normal distribution. Parts outside this range are highly likely to be defective.\n"
-      "     - +/- 2 standard deviations: This captures about 95% of the data. This could be used for less critical quality checks.")
-
-print("\n2. What percentile range should be used for acceptable parts?")
-print("   - A common approach is to use the 5th and 95th percentiles (or 2.5th and 97.5th for tighter control). Parts falling within this range are considered acceptable. Parts outside might need further inspection or rejection.")
-
-print("\n3. How would you identify systematic errors vs random variations?")
-print("   - Systematic Errors: These cause a shift in the mean of the measurements (as demonstrated in the code). Analyzing data segments (e.g., by time or batch) can reveal shifts. Control charts are very useful for this. \n"
-      "   - Random Variations: These are reflected in the standard deviation. A consistently high standard deviation (without a shift in mean) suggests random issues in the manufacturing process.")
-
-print("\n4. What metrics would indicate a need to adjust the manufacturing process?")
-print("   - A significant shift in the mean (indicating a systematic error).\n"
-      "   - A consistently high or increasing standard deviation (indicating increased random variation).\n"
-      "   - A large number of parts falling outside the quality control limits (defined by standard deviations or percentiles).\n"
-      "   - Trends or patterns in control charts (e.g., runs, cycles, or drifts).")
\ No newline at end of file
+
+from control_charts import ControlChartMonitor
+import datasets
+from instrumentation import stage
+from normality import normality_table
+import plots
+from plot_renderer import PlotRenderer
+from quantile_sketch import KLLSketch
+import schema
+import storage
+
+
+def main(plot_mode=None):
+    """Run the manufacturing quality control analysis and print its report."""
+    # Sample manufacturing data (replace with your actual data)
+    np.random.seed(42)  # for reproducibility
+    num_parts = 200
+    plot_renderer = PlotRenderer(plot_mode, analysis='manufacturing')  # 'show', 'save' (headless, in parallel) or 'skip'; see plot_renderer.py
+    target_dimension = 50  # Example target dimension (e.g., length in mm)
+    std_dev_normal = 2
+    # Simulate a systematic error (shift in mean of +3) for the last quarter of the
+    # parts; where it starts is unknown to the analysis below
+    with stage('load', 'manufacturing') as load:
+        df = datasets.manufacturing_parts(num_parts, target_dimension=target_dimension, std_dev_normal=std_dev_normal)
+
+        # Save to the columnar cache (see storage.py), with a CSV export
+        storage.save_dataset(df, 'manufacturing_parts', csv_path='manufacturing_parts.csv')
+
+        # Load from the cache (memory-mapped, no parsing), in compact dtypes (see schema.py)
+        df = schema.apply_schema(storage.load_dataset('manufacturing_parts'), 'manufacturing_parts')
+        load.update(rows=len(df))
+
+
+    # --- Analysis ---
+    print("\n--- Overall Analysis ---")
+
+    with stage('statistics', 'manufacturing', rows=len(df)):
+        mean_dimension = df['Dimension'].mean()
+        std_dev_dimension = df['Dimension'].std()
+
+        print(f"Mean Dimension: {mean_dimension:.2f}")
+        print(f"Standard Deviation of Dimension: {std_dev_dimension:.2f}")
+
+        # Percentiles
+        percentiles = [5, 25, 50, 75, 95]
+        dimension_sketch = KLLSketch.from_values(df['Dimension'])  # one pass for all percentiles
+        for p, value in zip(percentiles, dimension_sketch.percentiles(percentiles)):
+            print(f"{p}th Percentile: {value:.2f}")
+
+    # Distribution Visualization
+    plot_renderer.submit('dimension_distribution', plots.dimension_distribution, df['Dimension'], figsize=(10, 6))
+
+    # Normality test (Shapiro-Wilk on subsamples once there are more than 5000 parts; see normality.py)
+    with stage('normality', 'manufacturing', rows=len(df)):
+        normality = normality_table(df, ['Dimension']).loc['Dimension']
+        stat, p = normality['shapiro_stat'], normality['shapiro_p']
+        print(f"Shapiro-Wilk Test: Statistics={stat:.3f}, p={p:.3f}")
+        alpha = 0.05
+        if p > alpha:
+            print('Sample looks Gaussian (fail to reject H0)')
+        else:
+            print('Sample does not look Gaussian (reject H0)')
+
+    # --- Online Control Chart Monitoring ---
+    # Parts are checked one at a time as they arrive, instead of comparing batches
+    # after the fact. The first baseline_parts (assumed in control) set the target
+    # and sigma; every later measurement updates Shewhart, CUSUM and EWMA charts.
+    with stage('control_charts', 'manufacturing', rows=len(df)):
+        baseline_parts = 50
+        monitor = ControlChartMonitor.from_baseline(df['Dimension'].iloc[:baseline_parts])
+        print(f"\n--- Online Control Chart Monitoring (baseline: first {baseline_parts} parts) ---")
+        print(f"Target: {monitor.target:.2f}, Sigma: {monitor.sigma:.2f}")
+
+        # The charts restart after each alarm and re-alarm while the shift lasts,
+        # so print each chart's first alarm and count the rest
+        part_ids = df['PartID'].tolist()
+        first_alarm = None
+        alarm_counts = {}
+        for part_id, dimension in zip(part_ids[baseline_parts:], df['Dimension'].tolist()[baseline_parts:]):
+            for alarm in monitor.update(dimension):
+                alarm_counts[alarm.chart] = alarm_counts.get(alarm.chart, 0) + 1
+                if alarm_counts[alarm.chart] > 1:
+                    continue
+                change_part = part_ids[baseline_parts + alarm.change_point]
+                print(f"Part {part_id}: first {alarm.chart} alarm (statistic={alarm.statistic:.2f}), change estimated at Part {change_part}")
+                if first_alarm is None:
+                    first_alarm = (part_id, change_part)
+        if alarm_counts:
+            print("Alarms per chart: " + ", ".join(f"{chart} {n}" for chart, n in alarm_counts.items()))
+
+        if first_alarm is None:
+            print("No alarms: the process stayed in control.")
+        else:
+            alarm_part, change_part = first_alarm
+            print(f"\nFirst alarm at Part {alarm_part}; shift estimated to start at Part {change_part}")
+
+            # --- Analysis before and after the detected shift ---
+            df_before = df[df['PartID'] < change_part]
+            df_after = df[df['PartID'] >= change_part]
+
+            print("\n--- Analysis Before Detected Shift ---")
+            print(f"Mean Dimension: {df_before['Dimension'].mean():.2f}")
+            print(f"Standard Deviation of Dimension: {df_before['Dimension'].std():.2f}")
+
+            print("\n--- Analysis After Detected Shift ---")
+            print(f"Mean Dimension: {df_after['Dimension'].mean():.2f}")
+            print(f"Standard Deviation of Dimension: {df_after['Dimension'].std():.2f}")
+
+
+    plot_renderer.close()
+
+    # --- Answers to Investigation Areas ---
+    print("\n--- Answers to Investigation Areas ---")
+
+    print("1. How can standard deviation help in setting quality control limits?")
+    print("   - Quality control limits are often set based on standard deviations from the mean. For example:\n"
+          "     - +/- 3 standard deviations: This captures about 99.7% of the data in a normal distribution. Parts outside this range are highly likely to be defective.\n"
+          "     - +/- 2 standard deviations: This captures about 95% of the data. This could be used for less critical quality checks.")
+
+    print("\n2. What percentile range should be used for acceptable parts?")
+    print("   - A common approach is to use the 5th and 95th percentiles (or 2.5th and 97.5th for tighter control). Parts falling within this range are considered acceptable. Parts outside might need further inspection or rejection.")
+
+    print("\n3. How would you identify systematic errors vs random variations?")
+    print("   - Systematic Errors: These cause a shift in the mean of the measurements (as demonstrated in the code). Analyzing data segments (e.g., by time or batch) can reveal shifts. Control charts are very useful for this. \n"
+          "   - Random Variations: These are reflected in the standard deviation. A consistently high standard deviation (without a shift in mean) suggests random issues in the manufacturing process.")
+
+    print("\n4. What metrics would indicate a need to adjust the manufacturing process?")
+    print("   - A significant shift in the mean (indicating a systematic error).\n"
+          "   - A consistently high or increasing standard deviation (indicating increased random variation).\n"
+          "   - A large number of parts falling outside the quality control limits (defined by standard deviations or percentiles).\n"
+          "   - Trends or patterns in control charts (e.g., runs, cycles, or drifts).")
+
+
+if __name__ == '__main__':
+    main()
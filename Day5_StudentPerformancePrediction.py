@@ -1,77 +1,91 @@
 import pandas as pd
 import numpy as np
-import scipy.stats as stats
-import matplotlib.pyplot as plt
-import seaborn as sns
-
-# Sample student data (replace with your actual data)
-np.random.seed(42)  # for reproducibility
-num_students = 100
-subjects = ['Math', 'Science', 'English', 'History']
-student_data = {
-    'StudentID': range(1, num_students + 1)
-}
-for subject in subjects:
-    student_data[subject] = np.random.normal(75, 10, num_students) # Mean 75, std dev 10
-df = pd.DataFrame(student_data)
-
-# Save to CSV
-df.to_csv('student_performance.csv', index=False)
-
-# Load from CSV
-df = pd.read_csv('student_performance.csv')
-
-# --- Analysis ---
-for subject in subjects:
-    print(f"\n--- {subject} Analysis ---")
-
-    # Percentiles
+
+from column_stats import describe_columns, column_zscores
+import datasets
+from instrumentation import stage
+from normality import normality_table
+import plots
+from plot_renderer import PlotRenderer
+import schema
+import storage
+
+
+def main(plot_mode=None):
+    """Run the student performance analysis and print its report."""
+    # Sample student data (replace with your actual data)
+    np.random.seed(42)  # for reproducibility
+    num_students = 100
+    plot_renderer = PlotRenderer(plot_mode, analysis='student')  # 'show', 'save' (headless, in parallel) or 'skip'; see plot_renderer.py
+    subjects = ['Math', 'Science', 'English', 'History']
+    with stage('load', 'student') as load:
+        df = datasets.student_performance(num_students, subjects=subjects)  # Mean 75, std dev 10 per subject
+
+        # Save to the columnar cache (see storage.py), with a CSV export
+        storage.save_dataset(df, 'student_performance', csv_path='student_performance.csv')
+
+        # Load from the cache (memory-mapped, no parsing), in compact dtypes (see schema.py)
+        df = schema.apply_schema(storage.load_dataset('student_performance'), 'student_performance')
+        load.update(rows=len(df))
+
+    # --- Analysis ---
+    # Percentiles, standard deviations and z-scores for every subject in one batched pass
     percentiles = [25, 50, 75, 90]
-    for p in percentiles:
-        print(f"{p}th Percentile: {np.percentile(df[subject], p):.2f}")
-
-    # Standard Deviation
-    std_dev = df[subject].std()
-    print(f"Standard Deviation: {std_dev:.2f}")
-
-    # Grade Distribution (Histogram and Density Plot)
-    plt.figure(figsize=(10, 5))
-    plt.subplot(1, 2, 1)
-    sns.histplot(df[subject], kde=False)
-    plt.title(f"{subject} Grade Distribution (Histogram)")
-
-    plt.subplot(1, 2, 2)
-    sns.kdeplot(df[subject])
-    plt.title(f"{subject} Grade Distribution (Density Plot)")
-    plt.show()
-    
-    #Normality Test
-    stat, p = stats.shapiro(df[subject])
-    print(f"Shapiro-Wilk Test: Statistics={stat:.3f}, p={p:.3f}")
-    alpha = 0.05
-    if p > alpha:
-        print('Sample looks Gaussian (fail to reject H0)')
-    else:
-        print('Sample does not look Gaussian (reject H0)')
-    
-    print("----------------------------")
-
-# --- Answers to Key Questions ---
-print("\n--- Answers to Key Questions ---")
-
-print("1. How would you use percentiles to categorize student performance?")
-print("   - Percentiles divide the data into 100 equal parts. For example:\n"
-      "     - Students below the 25th percentile: Need significant support.\n"
-      "     - Students between 25th and 50th percentile: Need monitoring and potential support.\n"
-      "     - Students between 50th and 75th percentile: Performing as expected.\n"
-      "     - Students above the 75th percentile: High performers.")
-
-print("\n2. What role does standard deviation play in identifying unusual performance patterns?")
-print("   - Standard deviation measures the spread of grades. A high standard deviation indicates a wider range of performance, possibly suggesting diverse learning paces or teaching effectiveness. A low standard deviation suggests more consistent performance. Students far from the mean (e.g., more than 2 standard deviations below) might need attention.")
-
-print("\n3. How can you determine if the grade distribution is normal?")
-print("   - Visually: Histograms and density plots can give a visual indication. A bell-shaped curve suggests a normal distribution.\n"
-      "   - Statistical Tests: The Shapiro-Wilk test is a common test for normality. A p-value greater than 0.05 suggests that the data is likely normally distributed.")
-
-print("\n4. At what percentile would you set intervention triggers?")
-print("   - This depends on the institution's policies and resources. A common approach is to set the trigger at the 25th percentile or lower. This means students in the bottom 25% of performance in a subject would receive intervention. You could also use a combination of percentile and standard deviation (e.g., students more than 1.5 standard deviations below the mean and below the 30th percentile).")
\ No newline at end of file
+    with stage('statistics', 'student', rows=len(df)):
+        subject_stats = describe_columns(df, subjects, percentiles=percentiles)
+        z_scores = column_zscores(df, subject_stats)
+    with stage('normality', 'student', rows=len(df)):
+        normality = normality_table(df, subjects, seed=42)  # all subjects at once, in parallel; see normality.py
+
+    for i, subject in enumerate(subjects):
+        print(f"\n--- {subject} Analysis ---")
+
+        # Percentiles
+        for p in percentiles:
+            print(f"{p}th Percentile: {subject_stats.loc[subject, f'{p}%']:.2f}")
+
+        # Standard Deviation
+        std_dev = subject_stats.loc[subject, 'std']
+        print(f"Standard Deviation: {std_dev:.2f}")
+        print(f"Students more than 2 standard deviations below the mean: {(z_scores[:, i] < -2).sum()}")
+
+        # Grade Distribution (Histogram and Density Plot)
+        plot_renderer.submit(f'grade_distribution_{subject}', plots.grade_distribution, df[subject], subject,
+                             figsize=(10, 5))
+
+        #Normality Test
+        stat, p = normality.loc[subject, ['shapiro_stat', 'shapiro_p']]
+        print(f"Shapiro-Wilk Test: Statistics={stat:.3f}, p={p:.3f}")
+        alpha = 0.05
+        if p > alpha:
+            print('Sample looks Gaussian (fail to reject H0)')
+        else:
+            print('Sample does not look Gaussian (reject H0)')
+
+        print("----------------------------")
+
+    plot_renderer.close()
+
+    # --- Answers to Key Questions ---
+    print("\n--- Answers to Key Questions ---")
+
+    print("1. How would you use percentiles to categorize student performance?")
+    print("   - Percentiles divide the data into 100 equal parts. For example:\n"
+          "     - Students below the 25th percentile: Need significant support.\n"
+          "     - Students between 25th and 50th percentile: Need monitoring and potential support.\n"
+          "     - Students between 50th and 75th percentile: Performing as expected.\n"
+          "     - Students above the 75th percentile: High performers.")
+
+    print("\n2. What role does standard deviation play in identifying unusual performance patterns?")
+    print("   - Standard deviation measures the spread of grades. A high standard deviation indicates a wider range of performance, possibly suggesting diverse learning paces or teaching effectiveness. A low standard deviation suggests more consistent performance. Students far from the mean (e.g., more than 2 standard deviations below) might need attention.")
+
+    print("\n3. How can you determine if the grade distribution is normal?")
+    print("   - Visually: Histograms and density plots can give a visual indication. A bell-shaped curve suggests a normal distribution.\n"
+          "   - Statistical Tests: The Shapiro-Wilk test is a common test for normality. A p-value greater than 0.05 suggests that the data is likely normally distributed.")
+
+    print("\n4. At what percentile would you set intervention triggers?")
+    print("   - This depends on the institution's policies and resources. A common approach is to set the trigger at the 25th percentile or lower. This means students in the bottom 25% of performance in a subject would receive intervention. You could also use a combination of percentile and standard deviation (e.g., students more than 1.5 standard deviations below the mean and below the 30th percentile).")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,105 +1,165 @@
+import os
+
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
 import scipy.stats as stats
 import datetime
 
-# Simulate response time data (replace with actual data)
-np.random.seed(42)
-num_data_points = 1000
-regions = ['North', 'South', 'East', 'West']
-time_periods = pd.to_datetime(['2024-01-01 00:00:00'] * num_data_points) + pd.to_timedelta(np.random.randint(0, 365*24*60, num_data_points), unit='m')
-response_times = np.concatenate([
-    np.random.normal(50, 10, int(num_data_points*0.8)),  # Most responses are fast
-    np.random.exponential(50, int(num_data_points*0.2)) # Some slow responses
-])
-response_times = np.clip(response_times, 0, 500) #Clip to avoid unrealistic values
-
-data = {
-    'Region': np.random.choice(regions, num_data_points),
-    'Timestamp': time_periods,
-    'ResponseTime': response_times
-}
-df = pd.DataFrame(data)
-
-# Simulate a performance degradation for the 'South' region after a certain time
-degradation_start_time = pd.to_datetime('2024-06-01 00:00:00')
-df.loc[(df['Region'] == 'South') & (df['Timestamp'] > degradation_start_time), 'ResponseTime'] += 30
-
-# Simulate some missing data
-missing_data_indices = np.random.choice(df.index, size=int(num_data_points * 0.05), replace=False)
-df.loc[missing_data_indices, 'ResponseTime'] = np.nan
-
-# Save to CSV
-df.to_csv('website_response_times.csv', index=False)
-
-# Load from CSV
-df = pd.read_csv('website_response_times.csv', parse_dates=['Timestamp'])
-
-# --- Data Cleaning (Handling Missing Data) ---
-df.dropna(inplace=True)  # Remove rows with missing response times (you could impute instead)
-
-# --- Analysis ---
-print("\n--- Overall Response Time Analysis ---")
-
-print(df['ResponseTime'].describe())
-
-# By Region
-for region in regions:
-    print(f"\n--- {region} Response Time Analysis ---")
-    region_df = df[df['Region'] == region]
-    print(region_df['ResponseTime'].describe())
-    
-    # Seasonality (Monthly Analysis)
-    region_df['Month'] = region_df['Timestamp'].dt.month
-    monthly_data = region_df.groupby('Month')['ResponseTime'].describe()
-    print("\nMonthly Response Time Statistics for " + region)
-    print(monthly_data)
-
-    plt.figure(figsize=(12, 6))
-    sns.boxplot(x='Month', y='ResponseTime', data=region_df)
-    plt.title(f"Monthly Response Time Distribution for {region}")
-    plt.show()
-
-# --- Threshold Setting (Example) ---
-# 95th percentile as a performance guarantee
-performance_guarantee_threshold = np.percentile(df['ResponseTime'], 95)
-print(f"\nPerformance Guarantee Threshold (95th percentile): {performance_guarantee_threshold:.2f} ms")
-
-# Alerting thresholds (example):
-warning_threshold = np.percentile(df['ResponseTime'], 90)
-critical_threshold = np.percentile(df['ResponseTime'], 99)
-
-print(f"Warning Threshold (90th percentile): {warning_threshold:.2f} ms")
-print(f"Critical Threshold (99th percentile): {critical_threshold:.2f} ms")
-
-# --- Answers to Analysis Questions ---
-print("\n--- Answers to Analysis Questions ---")
-
-print("1. How would you determine 'normal' response times?")
-print("   - Calculate descriptive statistics (mean, median, standard deviation). Visualize the distribution (histogram, box plot). Look for typical ranges and identify outliers.")
-
-print("\n2. What percentile should be used for performance guarantees?")
-print("   - The 95th or 99th percentile are commonly used. This means that 95% or 99% of requests will be served within that time. The choice depends on the desired level of service and business requirements.")
-
-print("\n3. How can standard deviation help identify stability issues?")
-print("   - A high or increasing standard deviation indicates inconsistent response times and potential instability. It means that response times are varying widely. A stable system will have a relatively low and consistent standard deviation.")
-
-print("\n4. What would be appropriate thresholds for different types of alerts?")
-print("   - Warning Threshold: A value that triggers a warning alert when response times start to deviate from the normal range (e.g., 90th percentile). \n"
-      "   - Critical Threshold: A higher value that triggers a critical alert when performance is severely degraded (e.g., 99th percentile). The thresholds should be based on business requirements and the acceptable level of performance.")
-
-print("\n--- Addressing Common Challenges ---")
-print("Handling Outliers: Use robust statistics (median, IQR) or remove/transform outliers if justified. \n"
-      "Dealing with Missing Data: Imputation (filling in missing values) or removal of rows with missing data. \n"
-      "Accounting for Seasonality: Analyze data by time periods (day of week, time of day, month) to identify seasonal patterns. \n"
-      "Determining Appropriate Sample Sizes: Larger sample sizes provide more reliable results. \n"
-      "Setting Meaningful Thresholds: Base thresholds on business requirements, historical data, and acceptable performance levels.")
-
-print("\n--- Implementation Considerations ---")
-print("Data Quality Requirements: Accurate timestamps and reliable response time measurements. \n"
-      "Calculation Frequency: Depends on the needs (e.g., hourly, daily). \n"
-      "Response Time Needs: How quickly do you need to react to performance issues? \n"
-      "Resource Limitations: How much computing power and storage are available? \n"
-      "Reporting Requirements: What kind of reports are needed (e.g., daily summaries, weekly trends)?")
\ No newline at end of file
+import datasets
+from groupby_engine import grouped_describe
+from instrumentation import stage
+import plots
+from plot_renderer import PlotRenderer
+from quantile_sketch import KLLSketch
+import schema
+import storage
+from streaming_stats import RunningStats, GroupedRunningStats
+
+
+def main(plot_mode=None, streaming_mode=None, input_path=None):
+    """Run the website response time analysis and print its report.
+
+    streaming_mode (or DAY5_STREAMING=1) reads the CSV in chunks, for log
+    files too large to load into memory at once. input_path (or
+    DAY5_WEBSITE_INPUT) analyses an existing Region,Timestamp,ResponseTime
+    CSV instead of generating one.
+    """
+    if streaming_mode is None:
+        streaming_mode = os.environ.get('DAY5_STREAMING', '0') == '1'
+    input_path = input_path or os.environ.get('DAY5_WEBSITE_INPUT')
+    # Simulate response time data (replace with actual data)
+    np.random.seed(42)
+    num_data_points = 1000
+    chunk_size = 100_000
+    plot_renderer = PlotRenderer(plot_mode, analysis='website')  # 'show', 'save' (headless, in parallel) or 'skip'; see plot_renderer.py
+    regions = datasets.REGIONS
+    # Mostly fast responses with some slow ones, a performance degradation for the
+    # 'South' region after June and 5% missing response times
+    if input_path is None:
+        input_path = 'website_response_times.csv'
+        with stage('generate', 'website', rows=num_data_points):
+            df = datasets.website_response_times(num_data_points)
+
+            # Save to the columnar cache (see storage.py); the CSV export is what streaming mode reads
+            storage.save_dataset(df, 'website_response_times', csv_path=input_path)
+        generated = True
+    else:
+        generated = False
+
+    if streaming_mode:
+        # --- Streaming Analysis (bounded memory) ---
+        # Read the CSV in chunks and fold each one into running accumulators,
+        # so peak memory depends on chunk_size rather than on the file size.
+        with stage('streaming', 'website') as streaming:
+            overall_stats = RunningStats()
+            region_stats = GroupedRunningStats()
+            monthly_stats = GroupedRunningStats()
+            for chunk in pd.read_csv(input_path, parse_dates=['Timestamp'], chunksize=chunk_size):
+                chunk = chunk.dropna()  # Remove rows with missing response times
+                chunk['Month'] = chunk['Timestamp'].dt.month
+                overall_stats.update(chunk['ResponseTime'].to_numpy())
+                region_stats.update(chunk, 'Region', 'ResponseTime')
+                monthly_stats.update(chunk, ['Region', 'Month'], 'ResponseTime')
+            streaming.update(rows=overall_stats.count)
+
+        with stage('statistics', 'website', rows=overall_stats.count):
+            print("\n--- Overall Response Time Analysis ---")
+
+            print(overall_stats.describe().rename('ResponseTime'))
+
+            monthly_table = monthly_stats.describe(names=['Region', 'Month'])
+            for region in regions:
+                if region not in region_stats.groups:
+                    continue
+                print(f"\n--- {region} Response Time Analysis ---")
+                print(region_stats.groups[region].describe().rename('ResponseTime'))
+
+                print("\nMonthly Response Time Statistics for " + region)
+                print(monthly_table.loc[region])
+
+        # --- Threshold Setting (Example) ---
+        performance_guarantee_threshold, warning_threshold, critical_threshold = overall_stats.quantiles([0.95, 0.90, 0.99])
+    else:
+        # Load from the cache (memory-mapped, no parsing) or the given CSV, in compact dtypes (see schema.py)
+        with stage('load', 'website') as load:
+            if generated:
+                df = storage.load_dataset('website_response_times')
+            else:
+                df = pd.read_csv(input_path, parse_dates=['Timestamp'])
+            df = schema.apply_schema(df, 'website_response_times')
+            load.update(rows=len(df))
+
+        # --- Data Cleaning (Handling Missing Data) ---
+        with stage('clean', 'website', rows=len(df)) as clean:
+            df.dropna(inplace=True)  # Remove rows with missing response times (you could impute instead)
+            clean.update(rows_kept=len(df))
+
+        # --- Analysis ---
+        with stage('statistics', 'website', rows=len(df)):
+            print("\n--- Overall Response Time Analysis ---")
+
+            print(df['ResponseTime'].describe())
+
+            # By Region and Month (Seasonality), computed for all regions in a single pass
+            df['Month'] = df['Timestamp'].dt.month
+            region_table = grouped_describe(df, 'Region', 'ResponseTime')
+            monthly_table = grouped_describe(df, ['Region', 'Month'], 'ResponseTime')
+            region_frames = dict(tuple(df.groupby('Region', sort=False, observed=True)))
+
+            for region in regions:
+                if region not in region_frames:
+                    continue
+                print(f"\n--- {region} Response Time Analysis ---")
+                print(region_table.loc[region].rename('ResponseTime'))
+
+                print("\nMonthly Response Time Statistics for " + region)
+                print(monthly_table.loc[region])
+
+                plot_renderer.submit(f'monthly_response_times_{region}', plots.monthly_response_times,
+                                     region_frames[region][['Month', 'ResponseTime']], region, figsize=(12, 6))
+
+        # --- Threshold Setting (Example) ---
+        # 95th percentile as a performance guarantee; 90th/99th as alerting thresholds (example)
+        with stage('thresholds', 'website', rows=len(df)):
+            response_sketch = KLLSketch.from_values(df['ResponseTime'])
+            performance_guarantee_threshold, warning_threshold, critical_threshold = response_sketch.percentiles([95, 90, 99])
+
+    plot_renderer.close()
+
+    print(f"\nPerformance Guarantee Threshold (95th percentile): {performance_guarantee_threshold:.2f} ms")
+    print(f"Warning Threshold (90th percentile): {warning_threshold:.2f} ms")
+    print(f"Critical Threshold (99th percentile): {critical_threshold:.2f} ms")
+
+    # --- Answers to Analysis Questions ---
+    print("\n--- Answers to Analysis Questions ---")
+
+    print("1. How would you determine 'normal' response times?")
+    print("   - Calculate descriptive statistics (mean, median, standard deviation). Visualize the distribution (histogram, box plot). Look for typical ranges and identify outliers.")
+
+    print("\n2. What percentile should be used for performance guarantees?")
+    print("   - The 95th or 99th percentile are commonly used. This means that 95% or 99% of requests will be served within that time. The choice depends on the desired level of service and business requirements.")
+
+    print("\n3. How can standard deviation help identify stability issues?")
+    print("   - A high or increasing standard deviation indicates inconsistent response times and potential instability. It means that response times are varying widely. A stable system will have a relatively low and consistent standard deviation.")
+
+    print("\n4. What would be appropriate thresholds for different types of alerts?")
+    print("   - Warning Threshold: A value that triggers a warning alert when response times start to deviate from the normal range (e.g., 90th percentile). \n"
+          "   - Critical Threshold: A higher value that triggers a critical alert when performance is severely degraded (e.g., 99th percentile). The thresholds should be based on business requirements and the acceptable level of performance.")
+
+    print("\n--- Addressing Common Challenges ---")
+    print("Handling Outliers: Use robust statistics (median, IQR) or remove/transform outliers if justified. \n"
+          "Dealing with Missing Data: Imputation (filling in missing values) or removal of rows with missing data. \n"
+          "Accounting for Seasonality: Analyze data by time periods (day of week, time of day, month) to identify seasonal patterns. \n"
+          "Determining Appropriate Sample Sizes: Larger sample sizes provide more reliable results. \n"
+          "Setting Meaningful Thresholds: Base thresholds on business requirements, historical data, and acceptable performance levels.")
+
+    print("\n--- Implementation Considerations ---")
+    print("Data Quality Requirements: Accurate timestamps and reliable response time measurements. \n"
+          "Calculation Frequency: Depends on the needs (e.g., hourly, daily). \n"
+          "Response Time Needs: How quickly do you need to react to performance issues? \n"
+          "Resource Limitations: How much computing power and storage are available? \n"
+          "Reporting Requirements: What kind of reports are needed (e.g., daily summaries, weekly trends)?")
+
+
+if __name__ == '__main__':
+    main()
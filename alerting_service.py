@@ -0,0 +1,235 @@
+import argparse
+import asyncio
+import time
+from collections import deque
+from datetime import datetime
+
+import numpy as np
+
+# Real-time response-time alerting over a sliding window per region.
+# Events are lines in the same layout as website_response_times.csv:
+#     Region,Timestamp,ResponseTime
+# where Timestamp is either epoch seconds or an ISO date-time. They arrive
+# on a TCP socket or are tailed from a growing file.
+#
+# Each region keeps its window (e.g. the last 5 minutes) as a ring of time
+# buckets. A bucket only counts events, and how many of them are above the
+# warning and critical thresholds. The window p90 exceeds the warning
+# threshold exactly when more than 10% of the window is above it, and
+# likewise for p99 and the critical threshold. So an event costs O(1) to
+# add and to check, and expired buckets are dropped from the front of the
+# ring. Events older than the window (relative to the newest event seen)
+# are not counted; they are reported as stale.
+#
+#   python alerting_service.py --tcp 127.0.0.1:9009 --warning 80 --critical 150
+#
+# Replaying history needs the events in time order (the generated CSV is
+# not), e.g. with a 30-day window in daily buckets:
+#   sort -t, -k2,2 website_response_times.csv > events.csv
+#   python alerting_service.py --tail events.csv --no-follow --window 2592000 --bucket 86400 \
+#       --thresholds-from website_response_times.csv
+
+class RegionWindow:
+    """Sliding time window of (count, above warning, above critical) buckets."""
+
+    def __init__(self, window_seconds, bucket_seconds):
+        self.window_seconds = window_seconds
+        self.bucket_seconds = bucket_seconds
+        self.buckets = deque()  # [bucket_start, count, above_warning, above_critical]
+        self.count = 0
+        self.above_warning = 0
+        self.above_critical = 0
+        self.stale = 0  # events older than the window when they arrived
+        self.level = 'ok'
+
+    def add(self, event_time, response_time, warning, critical):
+        """Count one event; returns False (and counts it as stale) if it is older than the window."""
+        bucket_start = event_time - event_time % self.bucket_seconds
+        if not self.buckets or self.buckets[-1][0] < bucket_start:
+            # Drop buckets that have slid out of the window
+            oldest = bucket_start - self.window_seconds + self.bucket_seconds
+            while self.buckets and self.buckets[0][0] < oldest:
+                _, n, w, c = self.buckets.popleft()
+                self.count -= n
+                self.above_warning -= w
+                self.above_critical -= c
+            self.buckets.append([bucket_start, 0, 0, 0])
+        elif bucket_start < self.buckets[-1][0] - self.window_seconds + self.bucket_seconds:
+            self.stale += 1
+            return False
+        # Events earlier than the newest bucket but still inside the window are
+        # counted in it (slightly late events are common on a socket; they do
+        # not reopen old buckets)
+        bucket = self.buckets[-1]
+        w = response_time > warning
+        c = response_time > critical
+        bucket[1] += 1
+        bucket[2] += w
+        bucket[3] += c
+        self.count += 1
+        self.above_warning += w
+        self.above_critical += c
+        return True
+
+
+class AlertingService:
+    """Consumes response-time events and prints an alert when a region changes level.
+
+    A region is 'critical' when more than 1% of the responses in its window
+    are above the critical threshold (window p99 > critical), 'warning' when
+    more than 10% are above the warning threshold (window p90 > warning),
+    and 'ok' otherwise. Alerts fire on every change of level once the window
+    holds at least min_events responses. For each alert the service records
+    how long after the event was received the alert was emitted, and how
+    long after the event's own timestamp, which is the end-to-end latency
+    when events carry live epoch timestamps.
+    """
+
+    def __init__(self, warning, critical, window_seconds=300, bucket_seconds=5, min_events=20):
+        self.warning = warning
+        self.critical = critical
+        self.window_seconds = window_seconds
+        self.bucket_seconds = bucket_seconds
+        self.min_events = min_events
+        self.windows = {}
+        self.events = 0
+        self.alerts = []
+        self.processing_latencies = []  # seconds from receiving an event to its alert
+        self.end_to_end_latencies = []  # seconds from the event timestamp to its alert
+
+    def handle_line(self, line, received=None):
+        received = time.perf_counter() if received is None else received
+        parts = line.strip().split(',')
+        if len(parts) != 3 or parts[0] == 'Region' or not parts[2]:
+            return None  # header, blank line or missing response time
+        region, timestamp, response = parts
+        try:
+            event_time = float(timestamp)
+        except ValueError:
+            event_time = datetime.fromisoformat(timestamp).timestamp()
+        return self.handle_event(region, event_time, float(response), received)
+
+    def handle_event(self, region, event_time, response_time, received):
+        window = self.windows.get(region)
+        if window is None:
+            window = self.windows[region] = RegionWindow(self.window_seconds, self.bucket_seconds)
+        self.events += 1
+        if not window.add(event_time, response_time, self.warning, self.critical):
+            return None
+
+        if window.count < self.min_events:
+            return None
+        if window.above_critical > 0.01 * window.count:
+            level = 'critical'
+        elif window.above_warning > 0.10 * window.count:
+            level = 'warning'
+        else:
+            level = 'ok'
+        if level == window.level:
+            return None
+        window.level = level
+
+        alert = {'region': region, 'level': level, 'event_time': event_time, 'window_events': window.count,
+                 'above_warning': window.above_warning / window.count,
+                 'above_critical': window.above_critical / window.count}
+        self.processing_latencies.append(time.perf_counter() - received)
+        self.end_to_end_latencies.append(time.time() - event_time)
+        self.alerts.append(alert)
+        print(f"[{level.upper():>8}] {region}: {alert['above_warning']:.1%} of {window.count} responses "
+              f"above {self.warning:.2f} ms, {alert['above_critical']:.1%} above {self.critical:.2f} ms "
+              f"(last {self.window_seconds:g} s)")
+        return alert
+
+    def report(self):
+        print("\n--- Alerting Summary ---")
+        stale = sum(window.stale for window in self.windows.values())
+        print(f"Events processed: {self.events}, alerts: {len(self.alerts)}, "
+              f"stale (older than the window, not counted): {stale}")
+        if self.alerts:
+            processing = np.array(self.processing_latencies) * 1e6
+            print(f"Receive-to-alert latency: median {np.median(processing):.1f} us, max {processing.max():.1f} us")
+            end_to_end = np.array(self.end_to_end_latencies) * 1e3
+            print(f"Event-to-alert latency:   median {np.median(end_to_end):.1f} ms, max {end_to_end.max():.1f} ms "
+                  "(meaningful for live epoch timestamps only)")
+
+    # --- Event sources ---
+
+    async def serve_tcp(self, host, port):
+        async def handle_client(reader, writer):
+            while line := await reader.readline():
+                self.handle_line(line.decode())
+            writer.close()
+
+        server = await asyncio.start_server(handle_client, host, port)
+        print(f"Listening for response-time events on {host}:{port}")
+        async with server:
+            await server.serve_forever()
+
+    async def tail_file(self, path, from_start=True, poll_seconds=0.2, follow=True):
+        with open(path) as f:
+            if not from_start:
+                f.seek(0, 2)
+            pending = ''
+            while True:
+                chunk = f.readline()
+                if chunk:
+                    pending += chunk
+                    if pending.endswith('\n'):
+                        self.handle_line(pending)
+                        pending = ''
+                    continue
+                if not follow:
+                    if pending:
+                        self.handle_line(pending)
+                    return
+                await asyncio.sleep(poll_seconds)
+
+
+def thresholds_from_csv(path):
+    """Warning (p90) and critical (p99) thresholds from a historical CSV, as the monitor script sets them."""
+    import pandas as pd
+
+    from quantile_sketch import KLLSketch
+
+    sketch = KLLSketch()
+    for chunk in pd.read_csv(path, usecols=['ResponseTime'], chunksize=1_000_000):
+        sketch.update(chunk['ResponseTime'].to_numpy())
+    warning, critical = sketch.percentiles([90, 99])
+    return float(warning), float(critical)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Sliding-window response-time alerting per region.")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--tcp', metavar='HOST:PORT', help="listen for event lines on a TCP socket")
+    source.add_argument('--tail', metavar='FILE', help="follow a file of event lines")
+    parser.add_argument('--no-follow', action='store_true', help="with --tail, stop at the end of the file")
+    parser.add_argument('--warning', type=float, help="warning threshold in ms (window p90)")
+    parser.add_argument('--critical', type=float, help="critical threshold in ms (window p99)")
+    parser.add_argument('--thresholds-from', metavar='CSV', help="derive both thresholds from historical data")
+    parser.add_argument('--window', type=float, default=300, help="window length in seconds")
+    parser.add_argument('--bucket', type=float, default=5, help="bucket width in seconds")
+    parser.add_argument('--min-events', type=int, default=20, help="events needed in a window before alerting")
+    args = parser.parse_args(argv)
+
+    warning, critical = args.warning, args.critical
+    if args.thresholds_from:
+        warning, critical = thresholds_from_csv(args.thresholds_from)
+    if warning is None or critical is None:
+        parser.error("give --warning and --critical, or --thresholds-from")
+    print(f"Warning threshold: {warning:.2f} ms, critical threshold: {critical:.2f} ms")
+
+    service = AlertingService(warning, critical, args.window, args.bucket, args.min_events)
+    try:
+        if args.tcp:
+            host, port = args.tcp.rsplit(':', 1)
+            asyncio.run(service.serve_tcp(host, int(port)))
+        else:
+            asyncio.run(service.tail_file(args.tail, follow=not args.no_follow))
+    except KeyboardInterrupt:
+        pass
+    service.report()
+
+
+if __name__ == '__main__':
+    main()
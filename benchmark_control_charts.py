@@ -0,0 +1,60 @@
+import time
+
+import numpy as np
+
+from control_charts import ControlChartMonitor
+
+# Throughput benchmark for the online control-chart engine (single core).
+# Measurements follow the QC script: target 50, sigma 2, and a +3 shift
+# for the "sustained shift" case, where almost every part raises an alarm.
+# Each case keeps its best of `repeats` runs (the least disturbed by other
+# load); the script exits with status 1 if any case is below the target.
+rng = np.random.default_rng(42)
+num_measurements = 4_000_000
+target_dimension = 50
+std_dev_normal = 2
+required_rate = 1_000_000  # measurements per second
+repeats = 5
+
+in_control = rng.normal(target_dimension, std_dev_normal, num_measurements)
+shifted = in_control + 3
+
+
+def measure(label, run, n):
+    """Best rate of `repeats` runs; run() builds a fresh monitor and returns its alarms."""
+    rate = 0.0
+    for _ in range(repeats):
+        start = time.perf_counter()
+        alarms = run()
+        rate = max(rate, n / (time.perf_counter() - start))
+    status = "OK" if rate >= required_rate else "below target"
+    print(f"{label:<40} {rate:>12,.0f} measurements/s  ({len(alarms)} alarms, {status})")
+    return rate
+
+
+print(f"--- Control Chart Throughput ({num_measurements:,} measurements, target {required_rate:,}/s) ---")
+
+# One measurement per call, as parts arrive on the line
+scalar_n = num_measurements // 10
+scalar_values = in_control[:scalar_n].tolist()
+
+
+def one_at_a_time():
+    monitor = ControlChartMonitor(target_dimension, std_dev_normal)
+    return [alarm for x in scalar_values for alarm in monitor.update(x)]
+
+
+rates = [measure("update() one at a time, in control", one_at_a_time, scalar_n)]
+
+# Batches, e.g. all parts measured since the last poll
+rates.append(measure("update_many(), in control",
+                     lambda: ControlChartMonitor(target_dimension, std_dev_normal).update_many(in_control),
+                     num_measurements))
+rates.append(measure("update_many(), sustained +3 shift",
+                     lambda: ControlChartMonitor(target_dimension, std_dev_normal).update_many(shifted),
+                     num_measurements))
+
+if min(rates) < required_rate:
+    print(f"FAILED: {sum(rate < required_rate for rate in rates)} case(s) below {required_rate:,} measurements/s")
+    raise SystemExit(1)
+print(f"All cases at or above {required_rate:,} measurements/s")
@@ -0,0 +1,238 @@
+import argparse
+import json
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+import datasets
+from column_stats import column_zscores, describe_columns
+from control_charts import ControlChartMonitor
+from groupby_engine import grouped_describe
+from instrumentation import rss_mb
+from outlier_index import IQROutlierIndex
+from quantile_sketch import KLLSketch
+from rollup_store import WaitTimeRollup
+import storage
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+# Scaling benchmark for the five Day5 analyses.
+# For every (analysis, number of rows) pair a fresh process generates the
+# dataset with the same generators the scripts use (datasets.py), then
+# times each stage separately: generate, csv_write, cache_write, csv_read,
+# cache_read, statistics, outliers and plot (the analysis stages run on the
+# memory-mapped cache, as the scripts do). Each stage record holds wall and
+# CPU seconds, the current and peak RSS, and is appended as one JSON line
+# to --output.
+#
+#   python benchmark_suite.py --rows 1e3,1e4,1e5,1e6
+#   python benchmark_suite.py --analyses website,hospital --rows 1e7,1e8
+
+
+# --- Statistics / outlier stages, mirroring what each script computes ---
+
+def customer_statistics(df):
+    amounts = df['PurchaseAmount']
+    amounts.mean(), amounts.median(), amounts.std()
+    KLLSketch.from_values(amounts).quantiles([0.25, 0.75])
+    pd.cut(amounts, bins=[0, 30, 70, 100, float('inf')]).value_counts()
+
+
+def customer_outliers(df):
+    outlier_index = IQROutlierIndex()
+    outlier_index.update(df['PurchaseAmount'], df['CustomerID'])
+    return outlier_index.outlier_count()
+
+
+def hospital_statistics(df):
+    waits = df['WaitTime']
+    waits.mean(), waits.median(), waits.std()
+    KLLSketch.from_values(waits).percentiles([25, 50, 75, 90, 95, 99])
+    rollup = WaitTimeRollup()
+    rollup.append(df)
+    rollup.peak_hours()
+    rollup.describe('EmergencyType')
+
+
+def hospital_outliers(df):
+    # Patients beyond the 99th-percentile service level
+    return int((df['WaitTime'] > KLLSketch.from_values(df['WaitTime']).quantile(0.99)).sum())
+
+
+def manufacturing_statistics(df):
+    dims = df['Dimension']
+    dims.mean(), dims.std()
+    KLLSketch.from_values(dims).percentiles([5, 25, 50, 75, 95])
+
+
+def manufacturing_outliers(df):
+    dims = df['Dimension'].to_numpy()
+    monitor = ControlChartMonitor.from_baseline(dims[:max(2, len(dims) // 4)])
+    return len(monitor.update_many(dims))
+
+
+def student_statistics(df):
+    describe_columns(df, datasets.SUBJECTS, percentiles=[25, 50, 75, 90])
+
+
+def student_outliers(df):
+    # Students more than 2 standard deviations below the mean, per subject
+    z = column_zscores(df, describe_columns(df, datasets.SUBJECTS, percentiles=[]))
+    return int((z < -2).sum())
+
+
+def website_statistics(df):
+    df = df.dropna()
+    df['ResponseTime'].describe()
+    df = df.assign(Month=df['Timestamp'].dt.month)
+    grouped_describe(df, 'Region', 'ResponseTime')
+    grouped_describe(df, ['Region', 'Month'], 'ResponseTime')
+
+
+def website_outliers(df):
+    times = df['ResponseTime'].dropna()
+    critical = KLLSketch.from_values(times).percentiles([99])[0]
+    return int((times > critical).sum())
+
+
+# --- Plot stages (headless, one representative figure per analysis that plots) ---
+
+def _plot(draw, *args, figsize=(10, 6)):
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=figsize)
+    draw(fig, *args)
+    fig.savefig(os.path.join(tempfile.gettempdir(), 'day5_benchmark_plot.png'))
+
+
+def hospital_plot(df):
+    import plots
+
+    _plot(plots.wait_time_by_emergency_type, df[['EmergencyType', 'WaitTime']], figsize=(8, 6))
+
+
+def manufacturing_plot(df):
+    import plots
+
+    _plot(plots.dimension_distribution, df['Dimension'])
+
+
+def student_plot(df):
+    import plots
+
+    _plot(plots.grade_distribution, df['Math'], 'Math', figsize=(10, 5))
+
+
+def website_plot(df):
+    import plots
+
+    region_df = df[df['Region'] == 'South'].assign(Month=lambda d: d['Timestamp'].dt.month)
+    _plot(plots.monthly_response_times, region_df[['Month', 'ResponseTime']], 'South', figsize=(12, 6))
+
+
+ANALYSES = {
+    'customer': (datasets.customer_purchases, [], customer_statistics, customer_outliers, None),  # no plots
+    'hospital': (datasets.hospital_wait_times, ['ArrivalTime'], hospital_statistics, hospital_outliers, hospital_plot),
+    'manufacturing': (datasets.manufacturing_parts, [], manufacturing_statistics, manufacturing_outliers,
+                      manufacturing_plot),
+    'student': (datasets.student_performance, [], student_statistics, student_outliers, student_plot),
+    'website': (datasets.website_response_times, ['Timestamp'], website_statistics, website_outliers, website_plot),
+}
+
+
+def _peak_rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2 ** 20 if sys.platform == 'darwin' else peak / 2 ** 10  # bytes on macOS, KiB elsewhere
+
+
+def run_case(analysis, rows, seed, workdir, plot_max_rows):
+    """Run every stage of one analysis at one size; returns the stage records."""
+    generate, date_columns, statistics, outliers, plot = ANALYSES[analysis]
+    path = os.path.join(workdir, f'{analysis}_{rows}.csv')
+    records = []
+    state = {}
+
+    def stage(name, fn):
+        wall, cpu = time.perf_counter(), time.process_time()
+        result = fn()
+        record = {'analysis': analysis, 'rows': rows, 'stage': name,
+                  'wall_s': round(time.perf_counter() - wall, 6),
+                  'cpu_s': round(time.process_time() - cpu, 6),
+                  'rss_mb': rss_mb(), 'peak_rss_mb': _peak_rss_mb()}
+        if isinstance(result, int):
+            record['flagged'] = result
+        records.append(record)
+
+    stage('generate', lambda: state.update(df=generate(rows, rng=np.random.RandomState(seed))))
+    stage('csv_write', lambda: state['df'].to_csv(path, index=False))
+    stage('cache_write', lambda: storage.save_dataset(state['df'], f'{analysis}_{rows}', cache_dir=workdir))
+    state.clear()
+    stage('csv_read', lambda: state.update(df=pd.read_csv(path, parse_dates=date_columns)))
+    state.clear()
+    stage('cache_read', lambda: state.update(df=storage.load_dataset(f'{analysis}_{rows}', cache_dir=workdir)))
+    stage('statistics', lambda: statistics(state['df']))
+    stage('outliers', lambda: outliers(state['df']))
+    if plot is not None and rows <= plot_max_rows:
+        stage('plot', lambda: plot(state['df']))
+    state.clear()
+    os.remove(path)
+    shutil.rmtree(storage.dataset_path(f'{analysis}_{rows}', workdir))
+    return records
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the Day5 analyses at increasing data sizes.")
+    parser.add_argument('--analyses', default=','.join(ANALYSES),
+                        help="comma-separated subset of: " + ', '.join(ANALYSES))
+    parser.add_argument('--rows', default='1e3,1e4,1e5,1e6',
+                        help="comma-separated row counts, e.g. 1e3,1e4,1e5,1e6,1e7,1e8")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--plot-max-rows', type=float, default=1e6,
+                        help="skip the plot stage above this many rows")
+    parser.add_argument('--workdir', default=None, help="where the temporary CSV files go")
+    parser.add_argument('--output', default='benchmark_results.jsonl')
+    args = parser.parse_args(argv)
+
+    analyses = args.analyses.split(',')
+    for name in analyses:
+        if name not in ANALYSES:
+            parser.error(f"unknown analysis {name!r}")
+    sizes = [int(float(r)) for r in args.rows.split(',')]
+    workdir = args.workdir or tempfile.mkdtemp(prefix='day5_benchmark_')
+    os.makedirs(workdir, exist_ok=True)
+
+    # One fresh process per case so that peak RSS belongs to that case only
+    context = multiprocessing.get_context('spawn')
+    print(f"{'analysis':<14}{'rows':>12}  {'stage':<11}{'wall s':>10}{'cpu s':>10}{'peak MB':>10}")
+    try:
+        with open(args.output, 'a') as out:
+            for rows in sizes:
+                for name in analyses:
+                    with ProcessPoolExecutor(1, mp_context=context) as pool:
+                        records = pool.submit(run_case, name, rows, args.seed, workdir, args.plot_max_rows).result()
+                    for record in records:
+                        out.write(json.dumps(record) + '\n')
+                        peak = record['peak_rss_mb']
+                        print(f"{name:<14}{rows:>12,}  {record['stage']:<11}{record['wall_s']:>10.3f}"
+                              f"{record['cpu_s']:>10.3f}{peak if peak is None else round(peak):>10}")
+                    out.flush()
+    finally:
+        if args.workdir is None:
+            shutil.rmtree(workdir, ignore_errors=True)
+    print(f"\nResults appended to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
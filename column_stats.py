@@ -0,0 +1,105 @@
+import numpy as np
+import pandas as pd
+
+# Batched statistics for many numeric columns at once (e.g. a gradebook with
+# one column per subject). The columns are treated as one 2-D array and
+# every statistic is computed with a single vectorised call per block of
+# columns, instead of one pass per statistic per column. Blocks bound the
+# temporary memory for very wide tables.
+
+_BLOCK_COLUMNS = 64
+
+
+def describe_columns(data, columns=None, percentiles=(25, 50, 75, 90), block_columns=_BLOCK_COLUMNS):
+    """Return one row of statistics per column of data.
+
+    data is a DataFrame or a 2-D array (rows x columns). The result has
+    count, mean, std (ddof=1), the requested percentiles (same linear rule
+    as np.percentile), skew, excess kurtosis and the Jarque-Bera normality
+    statistic with its p-value. Missing values are ignored.
+    """
+    if isinstance(data, pd.DataFrame):
+        columns = list(data.columns) if columns is None else columns
+        data = data[columns].to_numpy()
+    data = np.asarray(data)
+    if columns is None:
+        columns = list(range(data.shape[1]))
+    qs = np.asarray(percentiles, dtype=np.float64) / 100
+    # float32 data (the compact schema) stays float32: half the memory traffic
+    # for the partition and the moment terms, which are summed in float64
+    dtype = np.float32 if data.dtype == np.float32 else np.float64
+
+    blocks = []
+    for start in range(0, data.shape[1], block_columns):
+        # One contiguous row per column, so every reduction below (and the
+        # partitioning behind the percentiles) runs over contiguous memory
+        block = np.array(data[:, start:start + block_columns].T, dtype=dtype, order='C')
+        has_nan = np.isnan(block).any()
+        if has_nan:
+            count = (~np.isnan(block)).sum(axis=1)
+            mean = np.nanmean(block, axis=1, dtype=np.float64)
+            quantiles = np.nanquantile(block, qs, axis=1).astype(np.float64)
+        else:
+            count = np.full(block.shape[0], block.shape[1])
+            mean = block.mean(axis=1, dtype=np.float64)
+            quantiles = _quantiles(block, qs)
+        centred = block
+        centred -= mean[:, None].astype(dtype)  # in place: the block is a private copy
+        if has_nan:
+            np.nan_to_num(centred, copy=False)  # missing values contribute nothing to the moments
+        sq = centred * centred
+        m2 = sq.sum(axis=1, dtype=np.float64) / count
+        centred *= sq
+        m3 = centred.sum(axis=1, dtype=np.float64) / count
+        sq *= sq
+        m4 = sq.sum(axis=1, dtype=np.float64) / count
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            std = np.sqrt(m2 * count / (count - 1))
+            skew = m3 / m2 ** 1.5
+            kurtosis = m4 / m2 ** 2 - 3
+        jarque_bera = count / 6 * (skew ** 2 + kurtosis ** 2 / 4)
+
+        table = {'count': count.astype(np.float64), 'mean': mean, 'std': std}
+        for p, row in zip(percentiles, quantiles):
+            table[f'{p:g}%'] = row
+        table.update({'skew': skew, 'kurtosis': kurtosis, 'jarque_bera': jarque_bera,
+                      'jb_pvalue': np.exp(-jarque_bera / 2)})  # chi-squared survival function, 2 dof
+        blocks.append(pd.DataFrame(table, index=columns[start:start + block_columns]))
+    return pd.concat(blocks)
+
+
+def _quantiles(block, qs):
+    # np.quantile's linear rule, partitioning every row in place (the block is
+    # a private copy). One partition call with several kth indices is several
+    # times slower than one call per index, so the order statistics are
+    # selected in ascending order, each in the part of the row right of the
+    # previous one. The next order statistic up is then the minimum of the
+    # stretch that follows, up to the next selected one.
+    n = block.shape[1]
+    position = qs * (n - 1)
+    below = np.floor(position).astype(np.intp)
+    kth = np.unique(below)
+    start = 0
+    for k in kth:
+        block[:, start:].partition(k - start, axis=1)
+        start = k + 1
+    low, high = {}, {}
+    for k, stop in zip(kth, np.append(kth[1:], n - 1)):
+        low[k] = block[:, k].astype(np.float64)
+        high[k] = block[:, min(k + 1, n - 1):stop + 1].min(axis=1).astype(np.float64)
+    quantiles = np.empty((len(qs), block.shape[0]))
+    for row, (k, t) in enumerate(zip(below, position - below)):
+        a, b = low[k], high[k]
+        quantiles[row] = b - (b - a) * (1 - t) if t >= 0.5 else a + (b - a) * t
+    return quantiles
+
+
+def column_zscores(data, summary, columns=None, dtype=np.float32):
+    """Z-scores of every value against its column's mean and std from describe_columns."""
+    if isinstance(data, pd.DataFrame):
+        columns = list(summary.index) if columns is None else columns
+        data = data[columns].to_numpy()
+    mean = summary['mean'].to_numpy()
+    std = summary['std'].to_numpy()
+    return ((np.asarray(data, dtype=np.float64) - mean) / std).astype(dtype, copy=False)
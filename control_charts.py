@@ -0,0 +1,418 @@
+import gc
+import math
+from collections import namedtuple
+from itertools import repeat
+
+import numpy as np
+from scipy.signal import lfilter
+
+# Online statistical process control for a stream of measurements.
+# Three charts run side by side on the standardised value z = (x - target) / sigma:
+#   - Shewhart: alarm when |z| > shewhart_limit (large, sudden shifts)
+#   - CUSUM:    two one-sided cumulative sums with allowance k and decision
+#               interval h (small, persistent shifts)
+#   - EWMA:     exponentially weighted mean with time-varying limits
+#               (small to moderate shifts)
+# Each measurement costs O(1) time and the state is a handful of floats.
+
+Alarm = namedtuple('Alarm', ['chart', 'index', 'value', 'statistic', 'change_point'])
+
+_NO_ALARMS = ()  # what update() returns when nothing fires, without building a list
+_new_alarm = tuple.__new__  # Alarm without the Python-level namedtuple __new__ (a third of the cost)
+
+_MIN_BLOCK = 64
+_MAX_BLOCK = 8192
+_DENSE_BLOCK = 65536
+_DENSE_SEGMENT = 256  # values per segment of _update_dense
+_MIN_DENSE_SEGMENTS = 32  # shorter stretches run through update()
+_CHARTS = np.array(['shewhart', 'cusum_upper', 'cusum_lower', 'ewma'])  # by rank in the alarm order
+
+
+class ControlChartMonitor:
+    """Shewhart, CUSUM and EWMA charts updated one measurement at a time.
+
+    update(x) ingests a single measurement and returns the alarms it raised
+    (usually none: an empty tuple). update_many(values) returns the same alarms
+    for a batch of measurements using vectorised NumPy code (the CUSUM and
+    EWMA statistics agree up to floating-point rounding).
+    Each Alarm carries the chart name, the index of the measurement that
+    triggered it, the chart statistic and the estimated change point:
+    the start of the current CUSUM run, or the last time the EWMA crossed
+    the centre line. CUSUM and EWMA restart after raising an alarm.
+    """
+
+    # Slots make the attribute reads and writes of update() cheaper
+    __slots__ = ('target', 'sigma', 'shewhart_limit', 'cusum_k', 'cusum_h', 'ewma_lambda', 'ewma_limit',
+                 'ewma_limits', '_ewma_limit_list', '_ewma_decay', '_last_step', 'count', 'cusum_upper',
+                 'cusum_lower', 'upper_start', 'lower_start', 'ewma', 'ewma_steps', 'ewma_cross')
+
+    def __init__(self, target, sigma, shewhart_limit=3.0, cusum_k=0.5, cusum_h=5.0,
+                 ewma_lambda=0.2, ewma_limit=3.0):
+        self.target = target
+        self.sigma = sigma
+        self.shewhart_limit = shewhart_limit
+        self.cusum_k = cusum_k
+        self.cusum_h = cusum_h
+        self.ewma_lambda = ewma_lambda
+        self.ewma_limit = ewma_limit
+        # The EWMA limit only depends on the number of steps since the last
+        # restart and converges quickly, so it is tabulated once.
+        steps = int(math.ceil(math.log(1e-16) / (2 * math.log(1.0 - ewma_lambda)))) + 2
+        decay = (1.0 - ewma_lambda) ** (2.0 * np.arange(steps))
+        self.ewma_limits = ewma_limit * np.sqrt(ewma_lambda / (2.0 - ewma_lambda) * (1.0 - decay))
+        self._ewma_limit_list = self.ewma_limits.tolist()
+        self._ewma_decay = 1.0 - ewma_lambda
+        self._last_step = steps - 1  # ewma_steps stops growing here: the limit has converged
+        self.count = 0
+        self.reset()
+
+    @classmethod
+    def from_baseline(cls, values, **kwargs):
+        """Build a monitor whose target and sigma come from in-control measurements."""
+        values = np.asarray(values, dtype=np.float64)
+        return cls(float(values.mean()), float(values.std(ddof=1)), **kwargs)
+
+    def reset(self):
+        self._reset_cusum()
+        self._reset_ewma()
+
+    def _reset_cusum(self):
+        self.cusum_upper = 0.0
+        self.cusum_lower = 0.0
+        self.upper_start = self.count
+        self.lower_start = self.count
+
+    def _reset_ewma(self):
+        self.ewma = 0.0
+        self.ewma_steps = 0
+        self.ewma_cross = self.count
+
+    def update(self, x):
+        i = self.count
+        self.count = i + 1
+        z = (x - self.target) / self.sigma
+        alarms = _NO_ALARMS
+
+        if not -self.shewhart_limit <= z <= self.shewhart_limit:
+            alarms = [_new_alarm(Alarm, ('shewhart', i, float(x), z, i))]
+
+        k = self.cusum_k
+        upper = self.cusum_upper + z - k
+        if upper <= 0.0:
+            upper = 0.0
+            self.upper_start = i + 1
+        lower = self.cusum_lower - z - k
+        if lower <= 0.0:
+            lower = 0.0
+            self.lower_start = i + 1
+        self.cusum_upper = upper
+        self.cusum_lower = lower
+        h = self.cusum_h
+        if upper > h or lower > h:
+            alarms = list(alarms)
+            if upper > h:
+                alarms.append(_new_alarm(Alarm, ('cusum_upper', i, float(x), upper, self.upper_start)))
+            if lower > h:
+                alarms.append(_new_alarm(Alarm, ('cusum_lower', i, float(x), lower, self.lower_start)))
+            self._reset_cusum()
+
+        previous = self.ewma
+        ewma = self.ewma_lambda * z + self._ewma_decay * previous
+        if (ewma > 0.0) is not (previous > 0.0):
+            self.ewma_cross = i
+        self.ewma = ewma
+        steps = self.ewma_steps
+        if steps < self._last_step:
+            steps += 1
+            self.ewma_steps = steps
+        limit = self._ewma_limit_list[steps]
+        if not -limit <= ewma <= limit:
+            alarms = list(alarms)
+            alarms.append(_new_alarm(Alarm, ('ewma', i, float(x), ewma, self.ewma_cross)))
+            self._reset_ewma()
+
+        return alarms
+
+    def update_many(self, values):
+        """Vectorised update for a batch of measurements; returns all alarms in order."""
+        # Alarms are tuple subclasses, which the garbage collector keeps tracking
+        # (unlike plain tuples of numbers); with millions of them in a list its
+        # passes cost more than the charts. They hold no reference cycles, so
+        # collection is paused while they are built.
+        collecting = gc.isenabled()
+        gc.disable()
+        try:
+            return self._update_many(np.asarray(values, dtype=np.float64))
+        finally:
+            if collecting:
+                gc.enable()
+
+    def _update_many(self, values):
+        alarms = []
+        start = 0
+        block = _MAX_BLOCK
+        dense = _MIN_BLOCK
+        while start < len(values):
+            if block < _MIN_BLOCK:
+                # Alarms are dense (e.g. a sustained shift): recomputing a block
+                # after every restart costs more than _update_dense. Stay there,
+                # with longer stretches, while there is an alarm every _MIN_BLOCK
+                # values or more often
+                before = len(alarms)
+                consumed = self._update_dense(values[start:start + dense], alarms)
+                start += consumed
+                if (len(alarms) - before) * _MIN_BLOCK >= consumed:
+                    dense = min(2 * dense, _DENSE_BLOCK)
+                else:
+                    block, dense = _MIN_BLOCK, _MIN_BLOCK
+                continue
+            consumed = self._update_block(values[start:start + block], alarms)
+            start += consumed
+            # Grow the look-ahead while no chart restarts, shrink it after one
+            block = min(_MAX_BLOCK, 2 * block) if consumed == block else 2 * consumed
+        return alarms
+
+    def _update_dense(self, x, alarms):
+        # For stretches where alarms are too dense for the vectorised blocks
+        # (e.g. a sustained shift, where a chart restarts every few values).
+        # The stretch is cut into segments that run side by side, one value
+        # per NumPy step, each as if its charts had just restarted. The real
+        # state is then carried into every segment with the scalar recursion
+        # until it raises an alarm where the segment's run did: both restart
+        # there, so the rest of that run is exact. CUSUM and EWMA restart
+        # independently and are followed separately.
+        n = len(x)
+        if n < _DENSE_SEGMENT * _MIN_DENSE_SEGMENTS:
+            # Too few values to pay for the NumPy steps
+            for value in x.tolist():
+                alarms.extend(self.update(value))
+            return n
+        i0 = self.count
+        z = (x - self.target) / self.sigma
+        zs = z.tolist()
+        segments = n // _DENSE_SEGMENT
+        length = _DENSE_SEGMENT
+        steps_grid = np.ascontiguousarray(z[:segments * length].reshape(segments, length).T)  # one row per step
+        starts = i0 + length * np.arange(segments)
+        column = np.arange(length)
+        found = [[], [], [], []]  # position, chart rank, statistic, change point
+
+        shewhart = self.shewhart_limit
+        hits = np.flatnonzero(~((-shewhart <= z) & (z <= shewhart)))
+        _add_found(found, hits, 0, z[hits], i0 + hits)
+
+        # CUSUM (statistics per step; run starts are worked out afterwards)
+        k, h = self.cusum_k, self.cusum_h
+        upper, lower = np.zeros(segments), np.zeros(segments)
+        run_upper, run_lower = np.empty((length, segments)), np.empty((length, segments))
+        for m in range(length):
+            zm = steps_grid[m]
+            np.add(upper, zm, out=upper)
+            np.subtract(upper, k, out=upper)
+            np.maximum(upper, 0.0, out=upper)
+            np.subtract(lower, zm, out=lower)
+            np.subtract(lower, k, out=lower)
+            np.maximum(lower, 0.0, out=lower)
+            run_upper[m], run_lower[m] = upper, lower
+            fire = (upper > h) | (lower > h)
+            if fire.any():
+                upper[fire] = lower[fire] = 0.0
+        run_upper, run_lower = run_upper.T, run_lower.T
+        fired = (run_upper > h) | (run_lower > h)
+        # A run starts after the last value where the sum was 0, or after the last alarm
+        restarted = np.zeros_like(fired)
+        restarted[:, 1:] = fired[:, :-1]
+        run_upper_start = starts[:, None] + np.maximum.accumulate(
+            np.where(run_upper <= 0.0, column + 1, np.where(restarted, column, 0)), axis=1)
+        run_lower_start = starts[:, None] + np.maximum.accumulate(
+            np.where(run_lower <= 0.0, column + 1, np.where(restarted, column, 0)), axis=1)
+        last_fired = fired[:, -1]
+        ends = list(zip(upper.tolist(), lower.tolist(),
+                        np.where(last_fired, starts + length, run_upper_start[:, -1]).tolist(),
+                        np.where(last_fired, starts + length, run_lower_start[:, -1]).tolist()))
+
+        def cusum_alarms(state):
+            if state[0] > h:
+                yield 1, state[0], state[2]
+            if state[1] > h:
+                yield 2, state[1], state[3]
+
+        state = (self.cusum_upper, self.cusum_lower, self.upper_start, self.lower_start)
+        state, positions = self._follow(self._cusum_scan, lambda i: (0.0, 0.0, i, i), cusum_alarms,
+                                        zs, state, fired, ends, i0, found)
+        self.cusum_upper, self.cusum_lower, self.upper_start, self.lower_start = state
+        for rank, statistic, change in ((1, run_upper, run_upper_start), (2, run_lower, run_lower_start)):
+            statistic, change = statistic.ravel(), change.ravel()
+            chosen = positions[statistic[positions] > h]
+            _add_found(found, chosen, rank, statistic[chosen], change[chosen])
+
+        # EWMA (the same way: values and alarms per step, centre-line crossings afterwards)
+        lam, decay, last_step = self.ewma_lambda, self._ewma_decay, self._last_step
+        ewma = np.zeros(segments)
+        steps = np.zeros(segments, dtype=np.int64)
+        run_ewma = np.empty((length, segments))
+        fired = np.empty((length, segments), dtype=bool)
+        for m in range(length):
+            ewma = lam * steps_grid[m] + decay * ewma
+            steps += 1
+            np.minimum(steps, last_step, out=steps)
+            limit = self.ewma_limits[steps]
+            fire = ~((-limit <= ewma) & (ewma <= limit))
+            run_ewma[m], fired[m] = ewma, fire
+            if fire.any():
+                ewma[fire] = 0.0
+                steps[fire] = 0
+        run_ewma, fired = run_ewma.T, fired.T
+        positive = run_ewma > 0.0
+        was_positive = np.zeros_like(positive)  # before each value; 0 after a restart
+        was_positive[:, 1:] = positive[:, :-1] & ~fired[:, :-1]
+        restarted[:, 1:] = fired[:, :-1]
+        run_cross = starts[:, None] + np.maximum.accumulate(
+            np.where((positive != was_positive) | restarted, column, 0), axis=1)
+        crossed = np.where(fired[:, -1], starts + length, run_cross[:, -1])
+        ends = list(zip(ewma.tolist(), steps.tolist(), crossed.tolist()))
+
+        state = (self.ewma, self.ewma_steps, self.ewma_cross)
+        state, positions = self._follow(self._ewma_scan, lambda i: (0.0, 0, i), lambda state: [(3, state[0], state[2])],
+                                        zs, state, fired, ends, i0, found)
+        self.ewma, self.ewma_steps, self.ewma_cross = state
+        _add_found(found, positions, 3, run_ewma.ravel()[positions], run_cross.ravel()[positions])
+
+        self.count = i0 + n
+        # Alarms in stream order: by position, then shewhart, cusum_upper, cusum_lower, ewma
+        position, rank, statistic, change = (np.concatenate(column) for column in found)
+        order = np.lexsort((rank, position))
+        position = position[order]
+        columns = (_CHARTS[rank[order]].tolist(), (i0 + position).tolist(), x[position].tolist(),
+                   statistic[order].tolist(), change[order].tolist())
+        alarms.extend(map(_new_alarm, repeat(Alarm), zip(*columns)))
+        return n
+
+    def _follow(self, scan, restart, alarms_at, zs, state, fired, ends, i0, found):
+        # Carry the real state of one chart through the segments of _update_dense
+        # (and the values after the last one), adding the alarms it raises to
+        # found. Returns the final state and the positions of the segment-run
+        # alarms that are exact, i.e. after the real state has joined the run.
+        segments, length = fired.shape
+        valid = np.zeros(segments, dtype=np.int64)
+        extra = []  # (position, chart rank, statistic, change point)
+        for s in range(segments + 1):
+            p = s * length
+            stop = p + length if s < segments else len(zs)
+            valid_from = stop
+            while p < stop:
+                t, state = scan(zs, p, stop, state, i0)
+                if t is None:
+                    break
+                for alarm in alarms_at(state):
+                    extra.append((t,) + alarm)
+                if s < segments and fired[s, t - s * length]:
+                    valid_from, state = t + 1, ends[s]
+                    break
+                state, p = restart(i0 + t + 1), t + 1
+            if s < segments:
+                valid[s] = valid_from
+        extra = np.array(extra, dtype=np.float64).reshape(-1, 4)
+        _add_found(found, extra[:, 0].astype(np.int64), extra[:, 1].astype(np.int64), extra[:, 2],
+                   extra[:, 3].astype(np.int64))
+        positions = np.flatnonzero(fired.ravel())
+        return state, positions[positions >= valid[positions // length]]
+
+    def _cusum_scan(self, zs, p, stop, state, i0):
+        # CUSUM alone over zs[p:stop]: (position of its first alarm or None, state there or at stop)
+        k, h = self.cusum_k, self.cusum_h
+        upper, lower, upper_start, lower_start = state
+        for t in range(p, stop):
+            z = zs[t]
+            upper = upper + z - k
+            if upper <= 0.0:
+                upper = 0.0
+                upper_start = i0 + t + 1
+            lower = lower - z - k
+            if lower <= 0.0:
+                lower = 0.0
+                lower_start = i0 + t + 1
+            if upper > h or lower > h:
+                return t, (upper, lower, upper_start, lower_start)
+        return None, (upper, lower, upper_start, lower_start)
+
+    def _ewma_scan(self, zs, p, stop, state, i0):
+        # EWMA alone, like _cusum_scan
+        lam, decay = self.ewma_lambda, self._ewma_decay
+        limits, last_step = self._ewma_limit_list, self._last_step
+        ewma, steps, cross = state
+        for t in range(p, stop):
+            previous = ewma
+            ewma = lam * zs[t] + decay * previous
+            if (ewma > 0.0) is not (previous > 0.0):
+                cross = i0 + t
+            if steps < last_step:
+                steps += 1
+            limit = limits[steps]
+            if not -limit <= ewma <= limit:
+                return t, (ewma, steps, cross)
+        return None, (ewma, steps, cross)
+
+    def _update_block(self, x, alarms):
+        # Run all three charts over x assuming no restart, stop at the first
+        # CUSUM/EWMA alarm (which restarts that chart) and report how many
+        # values were consumed.
+        n = len(x)
+        i0 = self.count
+        z = (x - self.target) / self.sigma
+
+        # CUSUM via the Lindley recursion: S_t = C_t - min(-S_0, min_{j<=t} C_j)
+        upper_c = np.cumsum(z - self.cusum_k)
+        upper = upper_c - np.minimum(-self.cusum_upper, np.minimum.accumulate(upper_c))
+        lower_c = np.cumsum(-z - self.cusum_k)
+        lower = lower_c - np.minimum(-self.cusum_lower, np.minimum.accumulate(lower_c))
+
+        lam = self.ewma_lambda
+        ewma = lfilter([lam], [1.0, lam - 1.0], z, zi=[(1.0 - lam) * self.ewma])[0]
+        steps = np.minimum(self.ewma_steps + 1 + np.arange(n), len(self.ewma_limits) - 1)
+        limit = self.ewma_limits[steps]
+
+        restart = (upper > self.cusum_h) | (lower > self.cusum_h) | (np.abs(ewma) > limit)
+        hits = np.flatnonzero(restart)
+        end = int(hits[0]) + 1 if len(hits) else n
+
+        for j in np.flatnonzero(np.abs(z[:end]) > self.shewhart_limit).tolist():
+            alarms.append(Alarm('shewhart', i0 + j, float(x[j]), float(z[j]), i0 + j))
+
+        # Run starts / last centre-line crossing up to the last consumed value
+        last = end - 1
+        upper_zero = np.flatnonzero(upper[:end] <= 0.0)
+        lower_zero = np.flatnonzero(lower[:end] <= 0.0)
+        upper_start = i0 + int(upper_zero[-1]) + 1 if len(upper_zero) else self.upper_start
+        lower_start = i0 + int(lower_zero[-1]) + 1 if len(lower_zero) else self.lower_start
+        signs = np.concatenate([[self.ewma > 0.0], ewma[:end] > 0.0])
+        crossings = np.flatnonzero(signs[1:] != signs[:-1])
+        ewma_cross = i0 + int(crossings[-1]) if len(crossings) else self.ewma_cross
+
+        self.count = i0 + end
+        self.cusum_upper = max(float(upper[last]), 0.0)
+        self.cusum_lower = max(float(lower[last]), 0.0)
+        self.upper_start = upper_start
+        self.lower_start = lower_start
+        self.ewma = float(ewma[last])
+        self.ewma_steps = min(self.ewma_steps + end, self._last_step)
+        self.ewma_cross = ewma_cross
+
+        if len(hits):
+            value = float(x[last])
+            if upper[last] > self.cusum_h or lower[last] > self.cusum_h:
+                if upper[last] > self.cusum_h:
+                    alarms.append(Alarm('cusum_upper', i0 + last, value, float(upper[last]), upper_start))
+                if lower[last] > self.cusum_h:
+                    alarms.append(Alarm('cusum_lower', i0 + last, value, float(lower[last]), lower_start))
+                self._reset_cusum()
+            if abs(ewma[last]) > limit[last]:
+                alarms.append(Alarm('ewma', i0 + last, value, float(ewma[last]), ewma_cross))
+                self._reset_ewma()
+        return end
+
+
+def _add_found(found, positions, rank, statistics, change_points):
+    # Append one batch of alarms, as arrays, to the columns of _update_dense
+    for column, part in zip(found, (positions, np.broadcast_to(rank, positions.shape), statistics, change_points)):
+        column.append(part)
@@ -0,0 +1,104 @@
+import numpy as np
+import pandas as pd
+
+# Synthetic data generators for the Day5 analyses.
+# Each function builds the same distributions the scripts have always used,
+# scaled to any number of rows (the mixture proportions are kept). rng can
+# be np.random (the global state, seeded by the scripts), a
+# np.random.RandomState or a np.random.Generator, so a given seed always
+# gives the same data.
+#
+# start and stop select rows [start, stop) of a dataset of num_* rows, so a
+# large dataset can be built shard by shard (see shard_writer.py): mixtures,
+# shifts and missing values follow the global row numbers, and the frame's
+# index holds them. The default is the whole dataset.
+
+REGIONS = ['North', 'South', 'East', 'West']
+EMERGENCY_TYPES = ['Minor', 'Moderate', 'Severe']
+SUBJECTS = ['Math', 'Science', 'English', 'History']
+START_TIME = pd.Timestamp('2024-01-01 00:00:00')
+MINUTES_PER_YEAR = 365 * 24 * 60
+
+
+def _integers(rng, low, high, size):
+    # RandomState (and np.random) call it randint, Generator calls it integers
+    return rng.integers(low, high, size) if isinstance(rng, np.random.Generator) else rng.randint(low, high, size)
+
+
+def _segments(boundaries, start, stop):
+    # Number of rows of [start, stop) falling in each [boundaries[i], boundaries[i + 1])
+    return [max(0, min(stop, high) - max(start, low)) for low, high in zip(boundaries[:-1], boundaries[1:])]
+
+
+def customer_purchases(num_customers=100, rng=np.random, start=0, stop=None):
+    stop = num_customers if stop is None else stop
+    num_typical = int(num_customers * 0.8)
+    num_high = int(num_customers * 0.1)
+    typical, high, low = _segments([0, num_typical, num_typical + num_high, num_customers], start, stop)
+    return pd.DataFrame({
+        'CustomerID': range(start + 1, stop + 1),
+        'PurchaseAmount': np.concatenate([
+            rng.normal(50, 15, typical),  # Most customers spend around 50
+            rng.normal(200, 50, high),  # Some high spenders
+            rng.normal(10, 5, low)  # Few very low spenders
+        ])
+    }, index=pd.RangeIndex(start, stop))
+
+
+def hospital_wait_times(num_patients=500, rng=np.random, start=0, stop=None):
+    stop = num_patients if stop is None else stop
+    short, long = _segments([0, int(num_patients * 0.8), num_patients], start, stop)
+    wait_times = np.concatenate([
+        rng.exponential(15, short),  # Most patients have shorter waits
+        rng.normal(60, 20, long)  # Some longer, more complex cases
+    ])
+    wait_times = np.clip(wait_times, 0, 200)  # No negative waits, cap at 200 minutes
+    arrival_times = START_TIME + pd.to_timedelta(_integers(rng, 0, MINUTES_PER_YEAR, stop - start), unit='m')
+    df = pd.DataFrame({'WaitTime': wait_times, 'ArrivalTime': arrival_times}, index=pd.RangeIndex(start, stop))
+    df['EmergencyType'] = rng.choice(EMERGENCY_TYPES, stop - start, p=[0.6, 0.3, 0.1])  # More minor cases
+    return df
+
+
+def manufacturing_parts(num_parts=200, rng=np.random, target_dimension=50, std_dev_normal=2, start=0, stop=None):
+    stop = num_parts if stop is None else stop
+    df = pd.DataFrame({
+        'PartID': range(start + 1, stop + 1),
+        'Dimension': rng.normal(target_dimension, std_dev_normal, stop - start)
+    }, index=pd.RangeIndex(start, stop))
+    # Systematic error: the mean shifts by +3 for the last quarter of the parts
+    systematic_error_start = int(num_parts * 0.75)
+    df.loc[systematic_error_start:, 'Dimension'] += 3
+    return df
+
+
+def student_performance(num_students=100, rng=np.random, subjects=SUBJECTS, start=0, stop=None):
+    stop = num_students if stop is None else stop
+    student_data = {'StudentID': range(start + 1, stop + 1)}
+    for subject in subjects:
+        student_data[subject] = rng.normal(75, 10, stop - start)  # Mean 75, std dev 10
+    return pd.DataFrame(student_data, index=pd.RangeIndex(start, stop))
+
+
+def website_response_times(num_data_points=1000, rng=np.random, start=0, stop=None):
+    stop = num_data_points if stop is None else stop
+    rows = stop - start
+    time_periods = START_TIME + pd.to_timedelta(_integers(rng, 0, MINUTES_PER_YEAR, rows), unit='m')
+    fast, slow = _segments([0, int(num_data_points * 0.8), num_data_points], start, stop)
+    response_times = np.concatenate([
+        rng.normal(50, 10, fast),  # Most responses are fast
+        rng.exponential(50, slow)  # Some slow responses
+    ])
+    response_times = np.clip(response_times, 0, 500)  # Clip to avoid unrealistic values
+    df = pd.DataFrame({
+        'Region': rng.choice(REGIONS, rows),
+        'Timestamp': time_periods,
+        'ResponseTime': response_times
+    }, index=pd.RangeIndex(start, stop))
+    # Performance degradation for the 'South' region after June
+    degradation_start_time = pd.Timestamp('2024-06-01 00:00:00')
+    df.loc[(df['Region'] == 'South') & (df['Timestamp'] > degradation_start_time), 'ResponseTime'] += 30
+    # 5% missing response times (each shard gets its share of the int(5% of all rows))
+    num_missing = int(stop * 0.05) - int(start * 0.05)
+    missing = start + rng.choice(rows, size=num_missing, replace=False)
+    df.loc[missing, 'ResponseTime'] = np.nan
+    return df
@@ -0,0 +1,78 @@
+import numpy as np
+import pandas as pd
+
+# Vectorised equivalent of df.groupby(keys)[value_col].describe().
+# Every key column is factorised into integer codes, the codes are combined
+# into a single group id, and the rows are sorted once by (group id, value).
+# Counts, sums, min/max and the quartiles are then read off the sorted array
+# with bincount / reduceat, so the cost is one sort regardless of how many
+# groups there are.
+
+
+def _factorize(column):
+    if isinstance(column.dtype, pd.CategoricalDtype):
+        return column.cat.codes.to_numpy(), column.cat.categories
+    return pd.factorize(column, sort=True)
+
+
+def grouped_describe(df, keys, value_col, percentiles=(0.25, 0.50, 0.75)):
+    """Return the describe() table of value_col for every combination of keys.
+
+    Rows with a missing key or value are ignored, as in pandas. The result
+    is indexed by the key columns (a MultiIndex when several keys are given).
+    """
+    if isinstance(keys, str):
+        keys = [keys]
+    values = df[value_col].to_numpy(dtype=np.float64)
+    valid = ~np.isnan(values)
+
+    group_ids = np.zeros(len(df), dtype=np.int64)
+    uniques = []
+    for key in keys:
+        codes, levels = _factorize(df[key])
+        valid &= codes >= 0
+        group_ids = group_ids * len(levels) + codes
+        uniques.append(levels)
+
+    values = values[valid]
+    group_ids = group_ids[valid]
+    # Keep only combinations that actually occur
+    present, group_ids = np.unique(group_ids, return_inverse=True)
+    num_groups = len(present)
+
+    order = np.lexsort((values, group_ids))
+    values = values[order]
+    group_ids = group_ids[order]
+
+    counts = np.bincount(group_ids, minlength=num_groups)
+    starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    means = np.bincount(group_ids, weights=values, minlength=num_groups) / counts
+    # Second pass over the deviations keeps the variance numerically stable
+    sq_dev = np.bincount(group_ids, weights=(values - means[group_ids]) ** 2, minlength=num_groups)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        stds = np.sqrt(sq_dev / (counts - 1))
+
+    table = {'count': counts.astype(np.float64), 'mean': means, 'std': stds,
+             'min': values[starts] if num_groups else np.empty(0)}
+    for q in percentiles:
+        # Linear interpolation between the neighbouring order statistics,
+        # the same rule np.percentile and Series.quantile use
+        pos = starts + q * (counts - 1)
+        lo = np.floor(pos).astype(np.int64)
+        hi = np.minimum(lo + 1, starts + counts - 1)
+        frac = pos - lo
+        table[f'{q * 100:g}%'] = values[lo] + (values[hi] - values[lo]) * frac
+    table['max'] = values[starts + counts - 1] if num_groups else np.empty(0)
+
+    # Decode the combined group ids back into the key values
+    index_codes = []
+    remaining = present
+    for levels in reversed(uniques):
+        index_codes.append(remaining % len(levels))
+        remaining = remaining // len(levels)
+    index_codes.reverse()
+    if len(keys) == 1:
+        index = pd.Index(np.asarray(uniques[0])[index_codes[0]], name=keys[0])
+    else:
+        index = pd.MultiIndex(levels=uniques, codes=index_codes, names=keys)
+    return pd.DataFrame(table, index=index)
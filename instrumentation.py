@@ -0,0 +1,187 @@
+import cProfile
+import json
+import os
+import threading
+import time
+import tracemalloc
+
+# Stage timing for the Day5 analyses.
+# Each script wraps its stages (load, clean, statistics, outliers, normality,
+# plotting) in `with stage(name, analysis):`. When tracing is off, stage()
+# returns a shared do-nothing object, so the cost is one function call.
+# When it is on, every stage appends one record to the trace file: wall and
+# CPU seconds, resident memory and its change, row counts and any other
+# fields given. Two formats:
+#   jsonl  - one JSON object per line
+#   chrome - Trace Event Format (load the file in chrome://tracing or
+#            https://ui.perfetto.dev), one lane per process
+# Several processes (run_analyses.py, plot workers) can append to one file.
+#
+# Configuration, by environment variable or configure():
+#   DAY5_TRACE=trace.jsonl        turn tracing on (a .json path means chrome)
+#   DAY5_TRACE_FORMAT=chrome      override the format
+#   DAY5_PROFILE=cprofile,tracemalloc
+#       cprofile    - profile every outermost stage, one .prof file each in
+#                     DAY5_PROFILE_DIR (default 'profiles'; read with pstats)
+#       tracemalloc - add the bytes allocated and the allocation peak of
+#                     each stage to its record (slows the run noticeably)
+
+TRACE_FORMATS = ('jsonl', 'chrome')
+PROFILERS = ('cprofile', 'tracemalloc')
+
+_config = None  # None while tracing is off
+_stack = []  # stages currently open in this process
+_lock = threading.Lock()
+
+if hasattr(os, 'register_at_fork'):
+    # A forked worker (plot renderer, pools) starts with no open stages of its own
+    os.register_at_fork(after_in_child=_stack.clear)
+
+
+def configure(path=None, fmt=None, profile=(), profile_dir=None):
+    """Turn tracing on (path given) or off (path None); settings default to the environment."""
+    global _config
+    if path is None:
+        _config = None
+        return
+    fmt = fmt or ('chrome' if path.endswith('.json') else 'jsonl')
+    if fmt not in TRACE_FORMATS:
+        raise ValueError(f"trace format must be one of {TRACE_FORMATS}, got {fmt!r}")
+    for profiler in profile:
+        if profiler not in PROFILERS:
+            raise ValueError(f"profiler must be one of {PROFILERS}, got {profiler!r}")
+    if fmt == 'chrome':
+        # The JSON array format lets the closing ']' be left out, so events can be appended
+        try:
+            fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644)
+        except FileExistsError:
+            pass
+        else:
+            os.write(fd, b'[\n')
+            os.close(fd)
+    if 'tracemalloc' in profile and not tracemalloc.is_tracing():
+        tracemalloc.start()
+    _config = {'path': path, 'format': fmt, 'profile': tuple(profile),
+               'profile_dir': profile_dir or os.environ.get('DAY5_PROFILE_DIR', 'profiles')}
+
+
+def configure_from_environment():
+    profile = [p for p in os.environ.get('DAY5_PROFILE', '').split(',') if p]
+    configure(os.environ.get('DAY5_TRACE') or None, os.environ.get('DAY5_TRACE_FORMAT'), profile)
+
+
+def enabled():
+    return _config is not None
+
+
+def rss_mb():
+    """Current resident set size in MiB (Linux); None where /proc is not available."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2 ** 20
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+class _NullStage:
+    # What stage() returns while tracing is off
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def update(self, **fields):
+        pass
+
+
+_NULL_STAGE = _NullStage()
+
+
+class _Stage:
+    def __init__(self, name, analysis, fields):
+        self.name = name
+        self.analysis = analysis
+        self.fields = fields
+        self.profiler = None
+        self.peak = 0  # tracemalloc peak seen by stages nested in this one
+
+    def update(self, **fields):
+        """Add fields (e.g. rows=len(df)) to the record once they are known."""
+        self.fields.update(fields)
+
+    def __enter__(self):
+        profile = _config['profile']
+        if 'tracemalloc' in profile:
+            # tracemalloc has one peak counter: hand the peak so far to the enclosing stage
+            if _stack:
+                _stack[-1].peak = max(_stack[-1].peak, tracemalloc.get_traced_memory()[1])
+            tracemalloc.reset_peak()
+            self.traced = tracemalloc.get_traced_memory()[0]
+        if 'cprofile' in profile and not _stack:
+            self.profiler = cProfile.Profile()
+        _stack.append(self)
+        self.rss = rss_mb()
+        self.start = time.time()
+        self.cpu = time.process_time()
+        self.wall = time.perf_counter()
+        if self.profiler is not None:
+            self.profiler.enable()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self.profiler is not None:
+            self.profiler.disable()
+        wall = time.perf_counter() - self.wall
+        cpu = time.process_time() - self.cpu
+        _stack.pop()
+        rss = rss_mb()
+        record = {'stage': self.name, 'analysis': self.analysis, 'pid': os.getpid(),
+                  'start': round(self.start, 6), 'wall_s': round(wall, 6), 'cpu_s': round(cpu, 6),
+                  'rss_mb': rss, 'rss_delta_mb': None if rss is None or self.rss is None else rss - self.rss}
+        if 'tracemalloc' in _config['profile']:
+            current, peak = tracemalloc.get_traced_memory()
+            peak = max(peak, self.peak)
+            if _stack:
+                _stack[-1].peak = max(_stack[-1].peak, peak)
+            record['alloc_mb'] = (current - self.traced) / 2 ** 20
+            record['peak_alloc_mb'] = (peak - self.traced) / 2 ** 20
+        if exc_type is not None:
+            record['error'] = exc_type.__name__
+        record.update(self.fields)
+        if self.profiler is not None:
+            os.makedirs(_config['profile_dir'], exist_ok=True)
+            path = os.path.join(_config['profile_dir'],
+                                f"{self.analysis or 'day5'}_{self.name}_{os.getpid()}_{int(self.start * 1e3)}.prof")
+            self.profiler.dump_stats(path)
+            record['profile'] = path
+        _write(record)
+        return False
+
+
+def _write(record):
+    if _config['format'] == 'chrome':
+        event = {'name': record['stage'], 'cat': record['analysis'] or 'day5', 'ph': 'X',
+                 'ts': int(record['start'] * 1e6), 'dur': int(record['wall_s'] * 1e6), 'pid': record['pid'],
+                 'tid': threading.get_ident() % 2 ** 31,
+                 'args': {k: v for k, v in record.items() if k not in ('stage', 'analysis', 'pid', 'start')}}
+        line = json.dumps(event) + ',\n'
+    else:
+        line = json.dumps(record) + '\n'
+    with _lock:
+        # One write per record on an O_APPEND file, so processes do not interleave lines
+        fd = os.open(_config['path'], os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, line.encode())
+        finally:
+            os.close(fd)
+
+
+def stage(name, analysis=None, **fields):
+    """Context manager timing one stage; `with stage('load', 'hospital') as s: ...; s.update(rows=n)`."""
+    if _config is None:
+        return _NULL_STAGE
+    return _Stage(name, analysis, fields)
+
+
+configure_from_environment()
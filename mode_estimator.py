@@ -0,0 +1,148 @@
+import numpy as np
+
+# Mode of continuous data in one streaming pass.
+# scipy.stats.mode looks for the most frequent exact value, which for
+# continuous floats is a tie between (nearly) every value. Here the values
+# are counted into fixed-width bins instead and the mode is the peak of the
+# smoothed histogram, i.e. of a kernel density estimate with a Gaussian
+# kernel, refined between bins with a parabola through the peak.
+#
+# Memory is one integer count per bin over the observed range. When that
+# would exceed max_bins, neighbouring bins are merged in pairs (the bin
+# width doubles) before anything is allocated, so memory stays bounded
+# whatever the data, even a single extreme value.
+
+_MAX_BINS = 1 << 16
+
+
+class StreamingMode:
+    """Histogram/KDE-peak mode estimator fed with chunks of values.
+
+    bin_width is the histogram resolution. If None it is chosen from the
+    first chunk with the Freedman-Diaconis rule. smoothing is the standard
+    deviation of the Gaussian kernel, in bins (0 uses the raw histogram).
+    Bins are aligned to multiples of bin_width, so estimators with the same
+    bin width can be merged.
+    """
+
+    def __init__(self, bin_width=None, smoothing=1.0, max_bins=_MAX_BINS):
+        self.bin_width = bin_width
+        self.smoothing = smoothing
+        self.max_bins = max_bins
+        self.counts = np.zeros(0, dtype=np.int64)
+        self.offset = 0  # bin index of counts[0]
+        self.n = 0
+
+    def update(self, values):
+        values = np.asarray(values, dtype=np.float64).ravel()
+        if not np.isfinite(values).all():
+            values = values[np.isfinite(values)]
+        if values.size == 0:
+            return
+        if self.bin_width is None:
+            self.bin_width = _freedman_diaconis(values)
+        smallest, largest = values.min(), values.max()
+        # Widen the bins until this chunk and the current histogram fit in max_bins
+        while True:
+            low = int(np.floor(smallest / self.bin_width))
+            high = int(np.floor(largest / self.bin_width)) + 1
+            if self._span(low, high) <= self.max_bins:
+                break
+            if self.n:
+                self._coarsen()
+            else:
+                self.bin_width *= 2
+        scaled = values / self.bin_width
+        scaled -= low
+        self._add_counts(low, np.bincount(scaled.astype(np.int64)))  # truncation is floor once shifted to >= 0
+
+    def merge(self, other):
+        """Fold another estimator's histogram into this one."""
+        if other.n == 0:
+            return
+        if self.bin_width is None:
+            self.bin_width = other.bin_width
+        counts, offset, width = other.counts, other.offset, other.bin_width
+        # Bring both histograms to the coarser bin width (widths must differ by a power of two)
+        while width < self.bin_width:
+            counts, offset = _pair_bins(counts, offset)
+            width *= 2
+        while self.n and self.bin_width < width:
+            self._coarsen()
+        if width != self.bin_width:
+            raise ValueError(f"cannot merge bin width {other.bin_width} into {self.bin_width}")
+        self._add_counts(offset, counts)
+
+    def _span(self, low, high):
+        # Bins needed to hold [low, high) together with the current counts
+        if self.n:
+            low, high = min(low, self.offset), max(high, self.offset + len(self.counts))
+        return high - low
+
+    def _add_counts(self, offset, counts):
+        while self._span(offset, offset + len(counts)) > self.max_bins:
+            if self.n:
+                self._coarsen()
+            else:
+                self.bin_width *= 2
+            counts, offset = _pair_bins(counts, offset)
+        if self.n == 0:
+            self.counts, self.offset = counts.astype(np.int64), offset
+        else:
+            low = min(self.offset, offset)
+            high = max(self.offset + len(self.counts), offset + len(counts))
+            merged = np.zeros(high - low, dtype=np.int64)
+            merged[self.offset - low:self.offset - low + len(self.counts)] += self.counts
+            merged[offset - low:offset - low + len(counts)] += counts
+            self.counts, self.offset = merged, low
+        self.n += int(counts.sum())
+
+    def _coarsen(self):
+        self.counts, self.offset = _pair_bins(self.counts, self.offset)
+        self.bin_width *= 2
+
+    def density(self):
+        """Bin centres and the smoothed counts (the KDE evaluated on the bin grid)."""
+        centres = (self.offset + np.arange(len(self.counts)) + 0.5) * self.bin_width
+        if self.smoothing <= 0:
+            return centres, self.counts.astype(np.float64)
+        radius = int(np.ceil(4 * self.smoothing))
+        kernel = np.exp(-0.5 * (np.arange(-radius, radius + 1) / self.smoothing) ** 2)
+        smoothed = np.convolve(self.counts, kernel / kernel.sum())  # full convolution, centred below
+        return centres, smoothed[radius:radius + len(self.counts)]
+
+    def mode(self):
+        """Estimated mode, or None before any values are seen."""
+        if self.n == 0:
+            return None
+        centres, density = self.density()
+        peak = int(np.argmax(density))
+        if 0 < peak < len(density) - 1:
+            left, centre, right = density[peak - 1:peak + 2]
+            curvature = left - 2 * centre + right
+            if curvature < 0:
+                return float(centres[peak] + 0.5 * (left - right) / curvature * self.bin_width)
+        return float(centres[peak])
+
+    @classmethod
+    def from_values(cls, values, bin_width=None, smoothing=1.0, max_bins=_MAX_BINS):
+        estimator = cls(bin_width, smoothing, max_bins)
+        estimator.update(values)
+        return estimator
+
+
+def _pair_bins(counts, offset):
+    # Merge bins 2i and 2i+1: pad so counts[0] sits on an even bin index
+    start = offset % 2
+    counts = np.concatenate([np.zeros(start, dtype=np.int64), counts])
+    if len(counts) % 2:
+        counts = np.append(counts, 0)
+    return counts.reshape(-1, 2).sum(axis=1), (offset - start) // 2
+
+
+def _freedman_diaconis(values):
+    q1, q3 = np.percentile(values, [25, 75])
+    width = 2 * (q3 - q1) / len(values) ** (1 / 3)
+    if width <= 0:
+        width = (values.max() - values.min()) / 100 or 1.0
+    return float(width)
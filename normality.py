@@ -0,0 +1,109 @@
+import os
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+from column_stats import describe_columns
+from process_pool import process_pool
+
+# Normality tests for many columns of any length, as one results table.
+# Two kinds of test, either or both per call:
+#   'moments'   - skew, excess kurtosis and the Jarque-Bera test on the full
+#                 data, vectorised over columns (column_stats.describe_columns)
+#   'subsample' - Shapiro-Wilk, D'Agostino-Pearson and Anderson-Darling.
+#                 Shapiro-Wilk is only valid up to ~5000 values, so longer
+#                 columns are tested on `subsamples` random subsamples of
+#                 max_sample values and the median statistic and p-value are
+#                 reported. Shorter columns are tested once on all values.
+# Columns are split into groups that run on a process pool. Each column
+# draws its subsamples from its own child of SeedSequence(seed), so the
+# results do not depend on the number of workers.
+
+METHODS = ('moments', 'subsample')
+_MAX_SAMPLE = 5000
+
+
+def normality_table(data, columns=None, methods=METHODS, max_sample=_MAX_SAMPLE, subsamples=10, seed=0,
+                    workers=None):
+    """Return one row of normality statistics per column of data (a DataFrame or 2-D array)."""
+    for method in methods:
+        if method not in METHODS:
+            raise ValueError(f"method must be one of {METHODS}, got {method!r}")
+    if isinstance(data, pd.DataFrame):
+        columns = list(data.columns) if columns is None else columns
+        data = data[columns].to_numpy(dtype=np.float64)
+    data = np.asarray(data, dtype=np.float64)
+    if columns is None:
+        columns = list(range(data.shape[1]))
+    seeds = np.random.SeedSequence(seed).spawn(len(columns))
+
+    workers = workers or min(os.cpu_count() or 1, len(columns))
+    groups = np.array_split(np.arange(len(columns)), workers)
+    tasks = [(data[:, group], [columns[i] for i in group], [seeds[i] for i in group],
+              methods, max_sample, subsamples) for group in groups if len(group)]
+    if len(tasks) == 1:
+        tables = [_test_columns(*tasks[0])]
+    else:
+        with process_pool(len(tasks)) as pool:
+            tables = list(pool.map(_test_columns, *zip(*tasks)))
+    return pd.concat(tables)
+
+
+def _test_columns(block, columns, seeds, methods, max_sample, subsamples):
+    # Runs in a worker: every requested test for one group of columns
+    table = pd.DataFrame(index=columns)
+    table['n'] = (~np.isnan(block)).sum(axis=0)
+    if 'moments' in methods:
+        moments = describe_columns(block, columns, percentiles=())
+        table[['skew', 'kurtosis', 'jarque_bera', 'jb_pvalue']] = moments[['skew', 'kurtosis', 'jarque_bera',
+                                                                          'jb_pvalue']]
+    if 'subsample' in methods:
+        rows = [_subsample_tests(block[:, i], seed, max_sample, subsamples) for i, seed in enumerate(seeds)]
+        for key in rows[0] if rows else ():
+            table[key] = [row[key] for row in rows]
+    return table
+
+
+def _subsample_tests(values, seed, max_sample, subsamples):
+    values = values[~np.isnan(values)]
+    if len(values) <= max_sample:
+        samples = values[None, :]
+    else:
+        rng = np.random.default_rng(seed)
+        samples = np.stack([rng.choice(values, max_sample, replace=False) for _ in range(subsamples)])
+
+    shapiro = np.array([stats.shapiro(sample) for sample in samples])
+    dagostino_stat, dagostino_p = stats.normaltest(samples, axis=1) if samples.shape[1] >= 8 else (np.nan, np.nan)
+    anderson_stat, anderson_p = anderson_darling(samples)
+    return {
+        'sample_size': samples.shape[1],
+        'subsamples': samples.shape[0],
+        'shapiro_stat': float(np.median(shapiro[:, 0])),
+        'shapiro_p': float(np.median(shapiro[:, 1])),
+        'dagostino_stat': float(np.median(dagostino_stat)),
+        'dagostino_p': float(np.median(dagostino_p)),
+        'anderson_stat': float(np.median(anderson_stat)),
+        'anderson_p': float(np.median(anderson_p)),
+    }
+
+
+def anderson_darling(samples):
+    """Anderson-Darling normality statistic and p-value for each row of samples.
+
+    Mean and variance are estimated from the data (as in scipy.stats.anderson);
+    the p-value uses the D'Agostino & Stephens (1986) approximation.
+    """
+    samples = np.sort(np.atleast_2d(samples), axis=1)
+    n = samples.shape[1]
+    z = (samples - samples.mean(axis=1, keepdims=True)) / samples.std(axis=1, ddof=1, keepdims=True)
+    i = np.arange(1, n + 1)
+    a2 = -n - ((2 * i - 1) * (stats.norm.logcdf(z) + stats.norm.logsf(z[:, ::-1]))).sum(axis=1) / n
+
+    a = a2 * (1 + 0.75 / n + 2.25 / n ** 2)
+    p = np.select([a >= 0.6, a >= 0.34, a >= 0.2],
+                  [np.exp(1.2937 - 5.709 * a + 0.0186 * a ** 2),
+                   np.exp(0.9177 - 4.279 * a - 1.38 * a ** 2),
+                   1 - np.exp(-8.318 + 42.796 * a - 59.938 * a ** 2)],
+                  1 - np.exp(-13.436 + 101.14 * a - 223.73 * a ** 2))
+    return a2, np.clip(p, 0, 1)
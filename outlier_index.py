@@ -0,0 +1,100 @@
+import numpy as np
+
+# Incremental IQR outlier index.
+# Values are kept sorted (with the key of the row each came from), so:
+#   - the quartiles are read straight off the sorted array (exact, same
+#     linear interpolation as pandas/np.quantile)
+#   - the outliers are always a prefix (below the lower fence) and a suffix
+#     (above the upper fence) of that array, found with two binary searches
+#   - a new batch is merged in with one O(n + m) np.insert, and when the
+#     fences move only the values between the old and new fences change
+#     state, so only those ranges are looked at
+# Querying the outliers returns views of the sorted arrays, which costs
+# microseconds whatever the number of rows.
+
+
+class IQROutlierIndex:
+    """Flags values outside [Q1 - k*IQR, Q3 + k*IQR] as batches of values arrive.
+
+    keys identify the rows (e.g. CustomerIDs or DataFrame index labels) and
+    are what the outlier queries return. Missing values are ignored.
+    """
+
+    def __init__(self, k=1.5):
+        self.k = k
+        self.values = np.empty(0, dtype=np.float64)
+        self.keys = np.empty(0, dtype=np.int64)
+        self.lower = self.upper = np.nan
+        self._low_end = 0  # values[:_low_end] are below the lower fence
+        self._high_start = 0  # values[_high_start:] are above the upper fence
+
+    def __len__(self):
+        return len(self.values)
+
+    def update(self, values, keys):
+        """Add a batch; returns (keys newly flagged, keys no longer flagged)."""
+        values = np.asarray(values, dtype=np.float64)
+        keys = np.asarray(keys)
+        valid = ~np.isnan(values)
+        if not valid.all():
+            values, keys = values[valid], keys[valid]
+        order = np.argsort(values)
+        values, keys = values[order], keys[order]
+
+        old_values, old_keys = self.values, self.keys
+        old_lower, old_upper = self.lower, self.upper
+        if len(old_values):
+            positions = np.searchsorted(old_values, values, side='right')
+            self.values = np.insert(old_values, positions, values)
+            self.keys = np.insert(old_keys, positions, keys.astype(old_keys.dtype, copy=False))
+        else:
+            self.values, self.keys = values, keys
+        self._set_fences()
+
+        # Old values change state only between the old and the new fence
+        flagged, cleared = [], []
+        if len(old_values):
+            for old, new, side in ((old_lower, self.lower, 'low'), (old_upper, self.upper, 'high')):
+                band = slice(*np.searchsorted(old_values, sorted((old, new)), side='left' if side == 'low' else 'right'))
+                moved_in = new > old if side == 'low' else new < old
+                (flagged if moved_in else cleared).append(old_keys[band])
+        flagged.append(keys[(values < self.lower) | (values > self.upper)])
+        return np.concatenate(flagged), np.concatenate(cleared) if cleared else keys[:0]
+
+    def _set_fences(self):
+        q1, q3 = self.quartiles()
+        iqr = q3 - q1
+        self.lower, self.upper = q1 - self.k * iqr, q3 + self.k * iqr
+        self._low_end = int(np.searchsorted(self.values, self.lower, side='left'))
+        self._high_start = int(np.searchsorted(self.values, self.upper, side='right'))
+
+    def quartiles(self):
+        """Exact Q1 and Q3 (linear interpolation between order statistics)."""
+        n = len(self.values)
+        if n == 0:
+            return np.nan, np.nan
+        result = []
+        for q in (0.25, 0.75):
+            position = q * (n - 1)
+            below = int(position)
+            above = min(below + 1, n - 1)
+            result.append(self.values[below] + (self.values[above] - self.values[below]) * (position - below))
+        return tuple(result)
+
+    @property
+    def fences(self):
+        return self.lower, self.upper
+
+    def low_outliers(self):
+        """Keys of the values below the lower fence (a view, in value order)."""
+        return self.keys[:self._low_end]
+
+    def high_outliers(self):
+        """Keys of the values above the upper fence (a view, in value order)."""
+        return self.keys[self._high_start:]
+
+    def outlier_keys(self):
+        return np.concatenate([self.low_outliers(), self.high_outliers()])
+
+    def outlier_count(self):
+        return self._low_end + len(self.values) - self._high_start
@@ -0,0 +1,105 @@
+import os
+import time
+
+from instrumentation import stage
+from process_pool import process_pool
+
+# Where the Day5 scripts send their figures. Three modes:
+#   'show' - draw each figure and block on plt.show() (the original behaviour)
+#   'save' - render each figure with the Agg backend in a process pool and
+#            write it to output_dir, so the statistics never wait on drawing
+#   'skip' - do not draw anything
+# The mode can be picked in the script or with the DAY5_PLOT_MODE
+# environment variable (DAY5_PLOT_DIR sets the output directory).
+# With tracing on (see instrumentation.py) every submit, every worker render
+# and the final wait are recorded as stages of the analysis.
+
+PLOT_MODES = ('show', 'save', 'skip')
+
+
+def _render(name, draw, args, figsize, output_dir, formats, analysis=None):
+    # Runs in a worker process: build a headless figure and save it
+    from matplotlib.figure import Figure
+
+    start = time.perf_counter()
+    with stage('render', analysis, figure=name):
+        fig = Figure(figsize=figsize)
+        draw(fig, *args)
+        fig.tight_layout()
+        paths = []
+        for fmt in formats:
+            path = os.path.join(output_dir, f"{name}.{fmt}")
+            fig.savefig(path)
+            paths.append(path)
+    return paths, time.perf_counter() - start
+
+
+class PlotRenderer:
+    """Draw, save or skip the figures of one analysis run.
+
+    submit(name, draw, *args) takes a function from plots.py, which draws on
+    the Figure passed as its first argument. In 'save' mode the figure is
+    rendered in a worker process and submit() returns immediately; close()
+    waits for the remaining figures and prints how much wall time the
+    background rendering saved compared with drawing them one by one.
+    analysis names the run in trace records.
+    """
+
+    def __init__(self, mode=None, output_dir=None, formats=('png',), workers=None, analysis=None):
+        self.mode = mode or os.environ.get('DAY5_PLOT_MODE', 'show')
+        if self.mode not in PLOT_MODES:
+            raise ValueError(f"plot mode must be one of {PLOT_MODES}, got {self.mode!r}")
+        self.output_dir = output_dir or os.environ.get('DAY5_PLOT_DIR', 'plots')
+        self.formats = tuple(formats)
+        self.workers = workers
+        self.analysis = analysis
+        self.pool = None
+        self.futures = []
+        self.blocked = 0.0  # seconds the calling process spent on plotting
+        self.shown = 0
+
+    def _get_pool(self):
+        if self.pool is None:
+            os.makedirs(self.output_dir, exist_ok=True)
+            self.pool = process_pool(self.workers)  # forked where available; see process_pool.py
+        return self.pool
+
+    def submit(self, name, draw, *args, figsize=(10, 6)):
+        if self.mode == 'skip':
+            return
+        start = time.perf_counter()
+        with stage('plotting', self.analysis, figure=name, mode=self.mode):
+            if self.mode == 'show':
+                import matplotlib.pyplot as plt
+
+                fig = plt.figure(figsize=figsize)
+                draw(fig, *args)
+                plt.show()
+                self.shown += 1
+            else:
+                pool = self._get_pool()
+                self.futures.append(pool.submit(_render, name, draw, args, figsize, self.output_dir, self.formats,
+                                                self.analysis))
+        self.blocked += time.perf_counter() - start
+
+    def close(self):
+        """Wait for outstanding figures and print a short rendering report."""
+        if self.mode == 'skip':
+            print("\nPlots: skipped")
+            return
+        if self.mode == 'show':
+            print(f"\nPlots: {self.shown} figures shown, {self.blocked:.2f} s spent drawing and in plt.show()")
+            return
+        start = time.perf_counter()
+        with stage('plotting_wait', self.analysis, figures=len(self.futures)):
+            results = [f.result() for f in self.futures]
+            if self.pool is not None:
+                self.pool.shutdown()
+                self.pool = None
+        self.blocked += time.perf_counter() - start
+        serial = sum(seconds for _, seconds in results)
+        files = sum(len(paths) for paths, _ in results)
+        print(f"\nPlots: {files} files written to {self.output_dir}")
+        print(f"Rendering time if drawn serially: {serial:.2f} s, "
+              f"time the analysis waited: {self.blocked:.2f} s, saved: {serial - self.blocked:.2f} s")
+        self.futures = []
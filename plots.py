@@ -0,0 +1,43 @@
+import seaborn as sns
+
+# Figure-drawing functions used by the Day5 scripts.
+# Each one draws onto the Figure it is given (no pyplot state), so the same
+# function works for an interactive plt.show() window and for a headless
+# Agg figure rendered in a worker process (see plot_renderer.py).
+
+
+def arrivals_by_hour(fig, counts):
+    # counts: arrivals per hour of day (a Series indexed by hour)
+    ax = fig.subplots()
+    sns.barplot(x=counts.index, y=counts.to_numpy(), ax=ax)
+    ax.set_title("Patient Arrivals by Hour of Day")
+    ax.set_xlabel("Hour of Day")
+    ax.set_ylabel("Number of Patients")
+
+
+def wait_time_by_emergency_type(fig, df):
+    ax = fig.subplots()
+    sns.boxplot(x='EmergencyType', y='WaitTime', data=df, ax=ax)
+    ax.set_title("Wait Times by Emergency Type")
+
+
+def dimension_distribution(fig, dimensions):
+    ax = fig.subplots()
+    sns.histplot(dimensions, kde=True, ax=ax)
+    ax.set_title("Distribution of Part Dimensions")
+    ax.set_xlabel("Dimension")
+    ax.set_ylabel("Frequency")
+
+
+def grade_distribution(fig, scores, subject):
+    hist_ax, kde_ax = fig.subplots(1, 2)
+    sns.histplot(scores, kde=False, ax=hist_ax)
+    hist_ax.set_title(f"{subject} Grade Distribution (Histogram)")
+    sns.kdeplot(scores, ax=kde_ax)
+    kde_ax.set_title(f"{subject} Grade Distribution (Density Plot)")
+
+
+def monthly_response_times(fig, region_df, region):
+    ax = fig.subplots()
+    sns.boxplot(x='Month', y='ResponseTime', data=region_df, ax=ax)
+    ax.set_title(f"Monthly Response Time Distribution for {region}")
@@ -0,0 +1,18 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+# Process pools for the Day5 tools (plot rendering, normality tests, shard
+# writing, running the analyses side by side).
+# Workers are forked where the platform allows it, so they inherit the
+# modules already imported (numpy, pandas, matplotlib) instead of importing
+# them again. Spawn is the fallback and is safe too, as the Day5 scripts
+# only run their analysis under an if __name__ == '__main__' guard.
+
+
+def start_method():
+    return 'fork' if 'fork' in multiprocessing.get_all_start_methods() else 'spawn'
+
+
+def process_pool(workers=None):
+    """A ProcessPoolExecutor with `workers` processes (default: one per CPU)."""
+    return ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context(start_method()))
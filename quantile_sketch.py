@@ -0,0 +1,125 @@
+import numpy as np
+
+# KLL quantile sketch (Karnin, Lang & Liberty, 2016).
+# Values are kept in a stack of "compactors": an item at level h stands for
+# 2**h original values. New values go into a level-0 buffer; only when a
+# level overflows is it sorted and every other item (random offset)
+# promoted to the next level, so memory stays around 3 * k items whatever
+# the stream length and the rank error is roughly 1/k.
+# Inserting a value is an O(1) append; the sorting done by compactions adds
+# O(log k) per value amortised. Two sketches built on different shards can
+# be merged without the raw rows.
+
+_MIN_BUFFER = 256
+
+
+class KLLSketch:
+    """Mergeable, bounded-memory quantile sketch.
+
+    Until more than k values have been added the sketch holds every value
+    and quantile() gives the same answer as np.percentile. The compaction
+    offsets come from a generator seeded with seed, so the same input
+    always gives the same estimates.
+    """
+
+    def __init__(self, k=1024, seed=0):
+        self.k = k
+        self.count = 0
+        self.buffer = []  # level 0, kept as a list so single inserts are cheap
+        self.levels = [None]  # levels[0] is the buffer; higher levels are sorted arrays
+        self.rng = np.random.default_rng(seed)
+
+    def _capacity(self, level):
+        depth = len(self.levels) - level - 1
+        capacity = max(2, int(np.ceil(self.k * (2 / 3) ** depth)))
+        return max(capacity, _MIN_BUFFER) if level == 0 else capacity
+
+    def insert(self, value):
+        """Add a single value."""
+        if value != value:  # NaN
+            return
+        self.buffer.append(float(value))
+        self.count += 1
+        if len(self.buffer) > self._capacity(0):
+            self._compress()
+
+    def update(self, values):
+        """Add a batch of values (NaNs are ignored)."""
+        values = np.asarray(values, dtype=np.float64).ravel()
+        values = values[~np.isnan(values)]
+        start = 0
+        while start < len(values):
+            # Fill the buffer only up to its capacity so that large batches
+            # go through the same lazy compactions as single inserts
+            room = max(self._capacity(0) + 1 - len(self.buffer), 1)
+            chunk = values[start:start + room]
+            self.buffer.extend(chunk.tolist())
+            self.count += len(chunk)
+            start += len(chunk)
+            if len(self.buffer) > self._capacity(0):
+                self._compress()
+
+    def merge(self, other):
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        self.buffer.extend(other.buffer)
+        for h in range(1, len(other.levels)):
+            self.levels[h] = np.concatenate([self.levels[h], other.levels[h]])
+        self.count += other.count
+        self._compress()
+        return self
+
+    def _compact(self, h):
+        items = np.sort(np.asarray(self.buffer) if h == 0 else self.levels[h])
+        if h + 1 == len(self.levels):
+            self.levels.append(np.empty(0))
+        # An odd item out stays behind so no weight is lost
+        keep = items[:len(items) % 2]
+        promoted = items[len(keep):][self.rng.integers(2)::2]
+        if h == 0:
+            self.buffer = keep.tolist()
+        else:
+            self.levels[h] = keep
+        self.levels[h + 1] = np.concatenate([self.levels[h + 1], promoted])
+
+    def _compress(self):
+        # Compact every overflowing level, lowest first; a compaction can
+        # only make the level above it overflow.
+        h = 0
+        while h < len(self.levels):
+            size = len(self.buffer) if h == 0 else len(self.levels[h])
+            if size > self._capacity(h):
+                self._compact(h)
+            h += 1
+
+    def _sorted_items(self):
+        items = np.concatenate([np.asarray(self.buffer, dtype=np.float64)] + self.levels[1:])
+        weights = np.concatenate([np.ones(len(self.buffer))] +
+                                 [np.full(len(l), 2.0 ** h) for h, l in enumerate(self.levels) if h])
+        order = np.argsort(items, kind='stable')
+        return items[order], weights[order]
+
+    def quantiles(self, qs):
+        """Return the values at quantiles qs (each in [0, 1]) in one pass."""
+        qs = np.asarray(qs, dtype=np.float64)
+        if self.count == 0:
+            return np.full(qs.shape, np.nan)
+        items, weights = self._sorted_items()
+        # Place each item at the middle of the ranks it stands for; with unit
+        # weights this is exactly np.percentile's linear interpolation.
+        positions = np.cumsum(weights) - weights + (weights - 1) / 2
+        ranks = qs * (weights.sum() - 1)
+        return np.interp(ranks, positions, items)
+
+    def quantile(self, q):
+        return float(self.quantiles([q])[0])
+
+    def percentiles(self, ps):
+        """Convenience wrapper taking percentiles in [0, 100] like np.percentile."""
+        return self.quantiles(np.asarray(ps, dtype=np.float64) / 100)
+
+    @classmethod
+    def from_values(cls, values, k=1024, seed=0):
+        sketch = cls(k=k, seed=seed)
+        sketch.update(values)
+        return sketch
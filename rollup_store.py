@@ -0,0 +1,253 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+import storage
+
+# Pre-aggregated hourly rollup of hospital wait times.
+# Every (arrival hour, EmergencyType) bucket keeps the count, sum, sum of
+# squares, min and max of its wait times, plus a quantile state: counts in
+# logarithmic bins (as in DDSketch), so any value is known to within
+# relative_accuracy. Bins merge by adding counts, which lets a query over a
+# year of buckets combine them with a few vectorised calls instead of
+# rescanning rows. Only non-empty bins are stored, as (time, type, bin,
+# count) rows, once per hour and once per day; queries that do not need
+# hours read the daily rows, which are about 24 times fewer.
+#
+# Every table is kept sorted by its key, so append() merges new arrivals
+# in without re-sorting what is already there. The rollup is saved in the
+# columnar cache (storage.py) and can be loaded, appended to and saved again
+# as new arrivals come in.
+
+GROUP_KEYS = ('EmergencyType', 'HourOfDay', 'Date')
+SETTINGS_FILE = 'rollup.json'
+_TYPE_SLOTS = 1 << 8  # at most 256 emergency types
+_BIN_SLOTS = 1 << 16  # log bins; covers any practical range of values
+_BUCKET_COLUMNS = ('count', 'sum', 'sumsq', 'min', 'max')
+_BUCKET_REDUCERS = (np.add, np.add, np.add, np.minimum, np.maximum)
+
+
+def _reduce_by_key(keys, columns, reducers):
+    # Sort by key and reduce every column over runs of equal keys
+    order = np.argsort(keys)
+    keys = keys[order]
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+    return keys[starts], [reducer.reduceat(column[order], starts) for column, reducer in zip(columns, reducers)]
+
+
+def _merge_sorted(keys, columns, new_keys, new_columns, reducers):
+    # Merge reduced, sorted (new_keys, new_columns) into sorted (keys, columns):
+    # existing keys are combined in place, new keys inserted in order
+    position = np.searchsorted(keys, new_keys)
+    hit = position < len(keys)
+    hit[hit] = keys[position[hit]] == new_keys[hit]
+    missing = position[~hit]
+    # Where the existing keys end up once the missing ones are inserted before them
+    moved = position[hit] + np.searchsorted(missing, position[hit], side='right')
+    merged_keys = np.insert(keys, missing, new_keys[~hit])
+    merged = []
+    for column, new, reducer in zip(columns, new_columns, reducers):
+        column = np.insert(column, missing, new[~hit])
+        column[moved] = reducer(column[moved], new[hit])
+        merged.append(column)
+    return merged_keys, merged
+
+
+class WaitTimeRollup:
+    """Hourly wait-time aggregates per EmergencyType with mergeable quantile bins."""
+
+    def __init__(self, relative_accuracy=0.01, min_value=0.01):
+        self.relative_accuracy = relative_accuracy
+        self.min_value = min_value  # values below this share bin 0 (treated as 0)
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.types = []
+        # key = hour * _TYPE_SLOTS + type
+        self.bucket_keys = np.empty(0, dtype=np.int64)
+        self.buckets = {'count': np.empty(0, dtype=np.int64), 'sum': np.empty(0), 'sumsq': np.empty(0),
+                        'min': np.empty(0), 'max': np.empty(0)}
+        # key = (time * _TYPE_SLOTS + type) * _BIN_SLOTS + bin, with time in hours or days
+        self.bin_keys = {'hour': np.empty(0, dtype=np.int64), 'day': np.empty(0, dtype=np.int64)}
+        self.bin_counts = {'hour': np.empty(0, dtype=np.int64), 'day': np.empty(0, dtype=np.int64)}
+
+    def _bin_index(self, values):
+        index = np.zeros(len(values), dtype=np.int64)
+        positive = values >= self.min_value
+        index[positive] = np.ceil(np.log(values[positive] / self.min_value) / np.log(self.gamma)).astype(np.int64) + 1
+        return index
+
+    def _bin_value(self, index):
+        # Middle of each bin in relative terms, so the error is at most relative_accuracy
+        upper = self.min_value * self.gamma ** (index - 1.0)
+        return np.where(index > 0, 2 * upper / (1 + self.gamma), 0.0)
+
+    def append(self, df, time_col='ArrivalTime', type_col='EmergencyType', value_col='WaitTime'):
+        """Fold new rows into the rollup (rows with a missing wait time are ignored)."""
+        values = df[value_col].to_numpy(dtype=np.float64)
+        valid = ~np.isnan(values)
+        values = values[valid]
+        hours = df[time_col].to_numpy()[valid].astype('datetime64[h]').astype(np.int64)
+        labels = np.asarray(df[type_col].to_numpy()[valid], dtype=object)
+        for label in pd.unique(labels):
+            if label not in self.types:
+                self.types.append(label)
+        types = pd.Categorical(labels, categories=self.types).codes.astype(np.int64)
+
+        keys, columns = _reduce_by_key(hours * _TYPE_SLOTS + types,
+                                       [np.ones(len(values), dtype=np.int64), values, values * values, values, values],
+                                       _BUCKET_REDUCERS)
+        self.bucket_keys, merged = _merge_sorted(self.bucket_keys, [self.buckets[c] for c in _BUCKET_COLUMNS],
+                                                 keys, columns, _BUCKET_REDUCERS)
+        self.buckets = dict(zip(_BUCKET_COLUMNS, merged))
+
+        bins = self._bin_index(values)
+        for unit, times in (('hour', hours), ('day', hours // 24)):
+            keys, (counts,) = _reduce_by_key((times * _TYPE_SLOTS + types) * _BIN_SLOTS + bins,
+                                             [np.ones(len(values), dtype=np.int64)], [np.add])
+            self.bin_keys[unit], (self.bin_counts[unit],) = _merge_sorted(
+                self.bin_keys[unit], [self.bin_counts[unit]], keys, [counts], [np.add])
+
+    # --- Persistence (columnar cache) ---
+
+    def save(self, name, cache_dir=storage.CACHE_DIR):
+        storage.save_dataset(pd.DataFrame({'Key': self.bucket_keys, 'Count': self.buckets['count'],
+                                           'Sum': self.buckets['sum'], 'SumSq': self.buckets['sumsq'],
+                                           'Min': self.buckets['min'], 'Max': self.buckets['max']}),
+                             os.path.join(name, 'buckets'), cache_dir)
+        for unit in ('hour', 'day'):
+            storage.save_dataset(pd.DataFrame({'Key': self.bin_keys[unit], 'Count': self.bin_counts[unit]}),
+                                 os.path.join(name, f'{unit}_bins'), cache_dir)
+        with open(os.path.join(storage.dataset_path(name, cache_dir), SETTINGS_FILE), 'w') as f:
+            json.dump({'relative_accuracy': self.relative_accuracy, 'min_value': self.min_value,
+                       'types': self.types}, f)
+
+    @classmethod
+    def load(cls, name, cache_dir=storage.CACHE_DIR):
+        """Load a saved rollup (memory-mapped); append() and save() keep it up to date."""
+        with open(os.path.join(storage.dataset_path(name, cache_dir), SETTINGS_FILE)) as f:
+            settings = json.load(f)
+        rollup = cls(settings['relative_accuracy'], settings['min_value'])
+        rollup.types = settings['types']
+        buckets = storage.load_dataset(os.path.join(name, 'buckets'), cache_dir)
+        rollup.bucket_keys = buckets['Key'].to_numpy()
+        rollup.buckets = {'count': buckets['Count'].to_numpy(), 'sum': buckets['Sum'].to_numpy(),
+                          'sumsq': buckets['SumSq'].to_numpy(), 'min': buckets['Min'].to_numpy(),
+                          'max': buckets['Max'].to_numpy()}
+        for unit in ('hour', 'day'):
+            bins = storage.load_dataset(os.path.join(name, f'{unit}_bins'), cache_dir)
+            rollup.bin_keys[unit], rollup.bin_counts[unit] = bins['Key'].to_numpy(), bins['Count'].to_numpy()
+        return rollup
+
+    @staticmethod
+    def exists(name, cache_dir=storage.CACHE_DIR):
+        return os.path.exists(os.path.join(storage.dataset_path(name, cache_dir), SETTINGS_FILE))
+
+    # --- Queries ---
+
+    def _select(self, times, types, type_filter, start, end, hours_per_unit):
+        # Row mask for the type and [start, end) filters, or None when nothing is filtered out
+        mask = None
+        if type_filter is not None:
+            mask = np.isin(types, [self.types.index(t) for t in type_filter if t in self.types])
+        for bound, keep in ((start, np.greater_equal), (end, np.less)):
+            if bound is not None:
+                hour = pd.Timestamp(bound).to_datetime64().astype('datetime64[h]').astype(np.int64)
+                inside = keep(times, hour // hours_per_unit)
+                mask = inside if mask is None else mask & inside
+        return mask
+
+    def _group_codes(self, times, types, by, hours_per_unit):
+        # One integer code per row for each key, and the labels of the codes
+        codes, levels = [], []
+        for key in by:
+            if key == 'EmergencyType':
+                code, labels = types, np.array(self.types, dtype=object)
+            elif key == 'HourOfDay':
+                code, labels = times % 24, np.arange(24)
+            elif key == 'Date':
+                day = times * hours_per_unit // 24
+                first = int(day.min(initial=0))
+                code = day - first
+                labels = (np.arange(int(day.max(initial=first)) - first + 1) + first).astype('datetime64[D]')
+            else:
+                raise ValueError(f"group key must be one of {GROUP_KEYS}, got {key!r}")
+            codes.append(code)
+            levels.append(labels)
+        return codes, levels
+
+    def peak_hours(self, types=None, start=None, end=None):
+        """Arrivals per hour of day, like df['ArrivalTime'].dt.hour.value_counts().sort_index()."""
+        hours, type_codes = np.divmod(self.bucket_keys, _TYPE_SLOTS)
+        counts = self.buckets['count']
+        mask = self._select(hours, type_codes, types, start, end, 1)
+        if mask is not None:
+            hours, counts = hours[mask], counts[mask]
+        counts = np.bincount(hours % 24, weights=counts, minlength=24).astype(np.int64)
+        present = np.flatnonzero(counts)
+        return pd.Series(counts[present], index=pd.Index(present, name='HourOfDay'), name='count')
+
+    def describe(self, by='EmergencyType', types=None, start=None, end=None, percentiles=(0.25, 0.5, 0.75)):
+        """describe() table of wait times grouped by any of GROUP_KEYS.
+
+        count, mean, std, min and max are exact; the percentiles are within
+        relative_accuracy of the true values. start and end are rounded down
+        to the hour. Queries that neither group by HourOfDay nor start or end
+        mid-day are answered from the daily bins.
+        """
+        by = [by] if isinstance(by, str) else list(by)
+        hours, type_codes = np.divmod(self.bucket_keys, _TYPE_SLOTS)
+        columns = dict(self.buckets)
+        mask = self._select(hours, type_codes, types, start, end, 1)
+        if mask is not None:
+            hours, type_codes = hours[mask], type_codes[mask]
+            columns = {name: column[mask] for name, column in columns.items()}
+
+        codes, levels = self._group_codes(hours, type_codes, by, 1)
+        sizes = [len(level) for level in levels]
+        present, group = np.unique(np.ravel_multi_index(codes, sizes), return_inverse=True)
+        ngroups = len(present)
+        count = np.bincount(group, weights=columns['count'], minlength=ngroups)
+        total = np.bincount(group, weights=columns['sum'], minlength=ngroups)
+        total_sq = np.bincount(group, weights=columns['sumsq'], minlength=ngroups)
+        minimum = np.full(ngroups, np.inf)
+        np.minimum.at(minimum, group, columns['min'])
+        maximum = np.full(ngroups, -np.inf)
+        np.maximum.at(maximum, group, columns['max'])
+        mean = total / count
+        with np.errstate(invalid='ignore', divide='ignore'):
+            std = np.sqrt(np.maximum(total_sq - count * mean ** 2, 0) / (count - 1))
+
+        # Quantiles: per-group histogram of the bins, read at each rank
+        daily = 'HourOfDay' not in by and all(
+            bound is None or pd.Timestamp(bound) == pd.Timestamp(bound).normalize() for bound in (start, end))
+        unit, hours_per_unit = ('day', 24) if daily else ('hour', 1)
+        bin_keys, bin_counts = self.bin_keys[unit], self.bin_counts[unit]
+        bucket_keys, bins = np.divmod(bin_keys, _BIN_SLOTS)
+        times, bin_types = np.divmod(bucket_keys, _TYPE_SLOTS)
+        mask = self._select(times, bin_types, types, start, end, hours_per_unit)
+        if mask is not None:
+            times, bin_types, bins, bin_counts = times[mask], bin_types[mask], bins[mask], bin_counts[mask]
+        # The bins cover exactly the same days and types as the buckets, so the codes line up
+        bin_codes, _ = self._group_codes(times, bin_types, by, hours_per_unit)
+        bin_group = np.searchsorted(present, np.ravel_multi_index(bin_codes, sizes))
+        nbins = int(bins.max(initial=0)) + 1
+        histogram = np.bincount(bin_group * nbins + bins, weights=bin_counts,
+                                minlength=ngroups * nbins).reshape(ngroups, nbins)
+        cumulative = np.cumsum(histogram, axis=1)
+        table = {'count': count, 'mean': mean, 'std': std, 'min': minimum}
+        for q in percentiles:
+            # Interpolate between the two order statistics around the rank, as pandas does
+            rank = q * (count - 1)
+            below = np.floor(rank)
+            values = [np.clip(self._bin_value(np.minimum((cumulative <= r[:, None]).sum(axis=1), nbins - 1)),
+                              minimum, maximum) for r in (below, np.minimum(below + 1, count - 1))]
+            table[f'{q * 100:g}%'] = values[0] + (values[1] - values[0]) * (rank - below)
+        table['max'] = maximum
+
+        labels = [level[code] for level, code in zip(levels, np.unravel_index(present, sizes))]
+        if len(by) == 1:
+            index = pd.Index(labels[0], name=by[0])
+        else:
+            index = pd.MultiIndex.from_arrays(labels, names=by)
+        return pd.DataFrame(table, index=index).sort_index()
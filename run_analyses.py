@@ -0,0 +1,119 @@
+import argparse
+import contextlib
+import importlib
+import io
+import os
+import time
+import traceback
+from concurrent.futures import as_completed
+
+import instrumentation
+from instrumentation import stage
+from process_pool import process_pool, start_method
+
+# Runs the five Day5 analyses concurrently, one per worker process.
+# The heavy libraries are imported once here; with the fork start method
+# the workers inherit them instead of importing them again. Each analysis
+# prints into its own buffer, and the reports are printed in a fixed order
+# followed by the wall time of every analysis, so the whole run takes
+# about as long as the slowest one.
+#
+#   python run_analyses.py                      # all five, figures saved to plots/
+#   python run_analyses.py --analyses website,hospital --plot-mode skip
+#   python run_analyses.py --trace trace.json --profile cprofile   # see instrumentation.py
+
+ANALYSES = {
+    'customer': 'Day5_CustomerPurchaseAnalysis',
+    'hospital': 'Day5_HospitalWaitTimeAnalysis',
+    'manufacturing': 'Day5_ManufacturingQualityControl',
+    'student': 'Day5_StudentPerformancePrediction',
+    'website': 'Day5_WebsiteResponseTimeMonitoring',
+}
+
+
+def _preload():
+    # Everything the analyses import, so that forked workers share it
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.figure  # noqa: F401
+    import pandas  # noqa: F401
+    import scipy.stats  # noqa: F401
+    import seaborn  # noqa: F401
+
+    for module in ANALYSES.values():
+        importlib.import_module(module)
+
+
+def run_analysis(name, plot_mode):
+    """Run one analysis in this process; returns (name, report text, wall s, cpu s, error)."""
+    wall, cpu = time.perf_counter(), time.process_time()
+    output = io.StringIO()
+    error = None
+    with contextlib.redirect_stdout(output):
+        try:
+            with stage('analysis', name):
+                importlib.import_module(ANALYSES[name]).main(plot_mode=plot_mode)
+        except Exception:
+            error = traceback.format_exc()
+    return name, output.getvalue(), time.perf_counter() - wall, time.process_time() - cpu, error
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the Day5 analyses in parallel.")
+    parser.add_argument('--analyses', default=','.join(ANALYSES),
+                        help="comma-separated subset of: " + ', '.join(ANALYSES))
+    parser.add_argument('--plot-mode', default=os.environ.get('DAY5_PLOT_MODE', 'save'),
+                        choices=['save', 'skip'], help="figures cannot be shown from worker processes")
+    parser.add_argument('--workers', type=int, default=None, help="worker processes (default: one per analysis)")
+    parser.add_argument('--trace', default=os.environ.get('DAY5_TRACE'),
+                        help="append stage timings to this file (.json: Chrome trace, otherwise JSON lines)")
+    parser.add_argument('--profile', default=os.environ.get('DAY5_PROFILE', ''),
+                        help="comma-separated profilers for traced stages: " + ', '.join(instrumentation.PROFILERS))
+    args = parser.parse_args(argv)
+
+    names = args.analyses.split(',')
+    for name in names:
+        if name not in ANALYSES:
+            parser.error(f"unknown analysis {name!r}")
+
+    if args.trace:
+        # Through the environment as well, so that spawned workers pick it up
+        os.environ['DAY5_TRACE'] = args.trace
+        os.environ['DAY5_PROFILE'] = args.profile
+        instrumentation.configure_from_environment()
+
+    start = time.perf_counter()
+    _preload()
+    import_seconds = time.perf_counter() - start
+
+    results = {}
+    with process_pool(args.workers or len(names)) as pool:
+        futures = [pool.submit(run_analysis, name, args.plot_mode) for name in names]
+        for future in as_completed(futures):
+            name, report, wall, cpu, error = future.result()
+            results[name] = (report, wall, cpu, error)
+    total = time.perf_counter() - start
+
+    for name in names:
+        report, wall, cpu, error = results[name]
+        print(f"\n{'=' * 25} {name} ({wall:.2f} s) {'=' * 25}")
+        print(report, end='')
+        if error:
+            print(error, end='')
+
+    print(f"\n--- Run Summary ({start_method()} workers) ---")
+    print(f"{'analysis':<15}{'wall s':>9}{'cpu s':>9}  status")
+    for name in names:
+        _, wall, cpu, error = results[name]
+        print(f"{name:<15}{wall:>9.2f}{cpu:>9.2f}  {'FAILED' if error else 'ok'}")
+    walls = [results[name][1] for name in names]
+    print(f"Shared imports: {import_seconds:.2f} s")
+    print(f"Total wall time: {total:.2f} s (slowest analysis {max(walls):.2f} s, "
+          f"sum of analyses {sum(walls):.2f} s)")
+    if args.trace:
+        print(f"Stage trace: {args.trace}")
+    return 1 if any(results[name][3] for name in names) else 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
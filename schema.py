@@ -0,0 +1,149 @@
+import argparse
+import contextlib
+import importlib
+import io
+import os
+import re
+
+import numpy as np
+import pandas as pd
+
+import datasets
+
+# Compact in-memory types for the Day5 datasets.
+#   - labels repeated on every row (Region, EmergencyType) become categoricals,
+#     with their categories in sorted order so groupby output is unchanged
+#   - measurements become float32 (about 7 significant digits, far more
+#     than the two decimals every statistic is reported with)
+#   - integer IDs are downcast to the smallest type that holds them
+# The scripts apply the schema right after generating their data. Setting
+# DAY5_COMPACT_DTYPES=0 keeps the default dtypes, which is how the check
+# below compares the two:
+#
+#   python schema.py --rows 1e6     # memory report for every dataset
+#   python schema.py --check        # also compare every printed statistic
+
+CATEGORY = 'category'
+FLOAT = 'float32'
+INT = 'downcast'
+
+SCHEMAS = {
+    'customer_purchases': {'CustomerID': INT, 'PurchaseAmount': FLOAT},
+    'hospital_wait_times': {'WaitTime': FLOAT, 'EmergencyType': (CATEGORY, datasets.EMERGENCY_TYPES)},
+    'manufacturing_parts': {'PartID': INT, 'Dimension': FLOAT},
+    'student_performance': dict({'StudentID': INT}, **{subject: FLOAT for subject in datasets.SUBJECTS}),
+    'website_response_times': {'Region': (CATEGORY, datasets.REGIONS), 'ResponseTime': FLOAT},
+}
+
+# Generator and script module of every dataset, for the report and the check
+SOURCES = {
+    'customer_purchases': (datasets.customer_purchases, 'Day5_CustomerPurchaseAnalysis'),
+    'hospital_wait_times': (datasets.hospital_wait_times, 'Day5_HospitalWaitTimeAnalysis'),
+    'manufacturing_parts': (datasets.manufacturing_parts, 'Day5_ManufacturingQualityControl'),
+    'student_performance': (datasets.student_performance, 'Day5_StudentPerformancePrediction'),
+    'website_response_times': (datasets.website_response_times, 'Day5_WebsiteResponseTimeMonitoring'),
+}
+
+
+def enabled():
+    return os.environ.get('DAY5_COMPACT_DTYPES', '1') != '0'
+
+
+def apply_schema(df, name):
+    """Return df with the compact types of dataset name (unchanged if DAY5_COMPACT_DTYPES=0)."""
+    if not enabled():
+        return df
+    # A new frame from the columns, not df.copy(): columns the schema leaves
+    # alone (or that already have their type) stay the caller's arrays, e.g.
+    # memory-mapped by storage.load_dataset
+    columns = {column: df[column] for column in df.columns}
+    for column, kind in SCHEMAS[name].items():
+        values = columns[column]
+        if isinstance(kind, tuple):
+            dtype = pd.CategoricalDtype(sorted(kind[1]))
+            if values.dtype != dtype:
+                columns[column] = values.astype(dtype)
+        elif kind == INT:
+            columns[column] = pd.to_numeric(values, downcast='unsigned' if values.min() >= 0 else 'integer')
+        elif values.dtype != kind:
+            columns[column] = values.astype(kind)
+    return pd.DataFrame(columns, index=df.index, copy=False)
+
+
+def memory_report(before, after):
+    """Bytes per column before and after, with the total and the reduction factor."""
+    report = pd.DataFrame({'dtype_before': before.dtypes.astype(str), 'dtype_after': after.dtypes.astype(str),
+                           'bytes_before': before.memory_usage(index=False, deep=True),
+                           'bytes_after': after.memory_usage(index=False, deep=True)})
+    report.loc['total'] = ['', '', report['bytes_before'].sum(), report['bytes_after'].sum()]
+    report['factor'] = (report['bytes_before'] / report['bytes_after']).astype(float).round(2)
+    return report
+
+
+_NUMBER = re.compile(r'-?\d+(?:\.\d+)?(?:e[-+]?\d+)?')
+
+
+def compare_outputs(reference, compact, atol=0.0101, rtol=1e-4):
+    """Compare every number in two reports line by line; returns the mismatching line pairs.
+
+    Numbers are printed with two decimals, so a float32 value can round to
+    the other side of the last digit: atol allows that one-unit difference.
+    """
+    mismatches = []
+    reference_lines, compact_lines = reference.splitlines(), compact.splitlines()
+    if len(reference_lines) != len(compact_lines):
+        return [(f'{len(reference_lines)} lines', f'{len(compact_lines)} lines')]
+    for a, b in zip(reference_lines, compact_lines):
+        x = [float(v) for v in _NUMBER.findall(a)]
+        y = [float(v) for v in _NUMBER.findall(b)]
+        if _NUMBER.sub('#', a) != _NUMBER.sub('#', b) or len(x) != len(y) or \
+                not np.allclose(y, x, rtol=rtol, atol=atol):
+            mismatches.append((a, b))
+    return mismatches
+
+
+def _run_report(module, compact):
+    # Output of one analysis with or without the compact types
+    previous = os.environ.get('DAY5_COMPACT_DTYPES')
+    os.environ['DAY5_COMPACT_DTYPES'] = '1' if compact else '0'
+    np.random.seed(0)  # the customer analysis does not seed its own data
+    output = io.StringIO()
+    try:
+        with contextlib.redirect_stdout(output):
+            importlib.import_module(module).main(plot_mode='skip')
+    finally:
+        if previous is None:
+            del os.environ['DAY5_COMPACT_DTYPES']
+        else:
+            os.environ['DAY5_COMPACT_DTYPES'] = previous
+    return output.getvalue()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Memory report and statistic checks for the compact schema.")
+    parser.add_argument('--rows', type=float, default=1e6, help="rows per dataset for the memory report")
+    parser.add_argument('--check', action='store_true', help="compare every statistic the scripts print")
+    args = parser.parse_args(argv)
+
+    with pd.option_context('display.width', 160, 'display.max_columns', 10):
+        for name, (generate, _) in SOURCES.items():
+            before = generate(int(args.rows), rng=np.random.RandomState(0))
+            report = memory_report(before, apply_schema(before, name))
+            print(f"\n--- {name} ({int(args.rows):,} rows) ---")
+            print(report)
+
+    if not args.check:
+        return 0
+    print("\n--- Printed statistics, default vs compact dtypes ---")
+    failures = 0
+    for name, (_, module) in SOURCES.items():
+        mismatches = compare_outputs(_run_report(module, False), _run_report(module, True))
+        failures += len(mismatches)
+        print(f"{module}: {'ok' if not mismatches else f'{len(mismatches)} lines differ'}")
+        for a, b in mismatches:
+            print(f"    default: {a.strip()}\n    compact: {b.strip()}")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
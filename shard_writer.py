@@ -0,0 +1,99 @@
+import argparse
+import os
+import time
+
+import numpy as np
+
+import datasets
+from process_pool import process_pool
+import storage
+
+# Writes Day5 datasets of any size as deterministic shards, in parallel.
+# Shard i covers rows [i * shard_rows, (i + 1) * shard_rows) and draws from
+# its own np.random.Generator, seeded with child i of SeedSequence(seed).
+# So a shard's content depends only on (seed, rows, shard_rows, i), never
+# on the number of workers or the order they run in, and any shard can be
+# regenerated alone. Each worker builds one shard at a time with the
+# generators in datasets.py (same distributions, the same +3 shift, South
+# degradation and 5% missing values, placed by global row number) and writes
+# it straight to disk, so memory is bounded by the shard size.
+#
+#   python shard_writer.py website_response_times --rows 1e9 --shard-rows 1e7
+#   python shard_writer.py hospital_wait_times --rows 1e8 --format csv
+
+GENERATORS = {
+    'customer_purchases': datasets.customer_purchases,
+    'hospital_wait_times': datasets.hospital_wait_times,
+    'manufacturing_parts': datasets.manufacturing_parts,
+    'student_performance': datasets.student_performance,
+    'website_response_times': datasets.website_response_times,
+}
+FORMATS = ('cache', 'csv')
+SHARD_DIR = 'shards'
+
+
+def shard_name(index):
+    return f'shard_{index:05d}'
+
+
+def write_shard(name, rows, index, shard_rows, seed, output_dir, fmt):
+    """Generate and write one shard; returns (index, rows written, seconds)."""
+    start_time = time.perf_counter()
+    start, stop = index * shard_rows, min((index + 1) * shard_rows, rows)
+    rng = np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(index,)))  # = SeedSequence(seed).spawn(...)[index]
+    df = GENERATORS[name](rows, rng=rng, start=start, stop=stop)
+    directory = os.path.join(output_dir, name)
+    if fmt == 'csv':
+        os.makedirs(directory, exist_ok=True)
+        df.to_csv(os.path.join(directory, shard_name(index) + '.csv'), index=False)
+    else:
+        storage.save_dataset(df, shard_name(index), cache_dir=directory)
+    return index, stop - start, time.perf_counter() - start_time
+
+
+def write_dataset(name, rows, shard_rows=10_000_000, seed=0, output_dir=SHARD_DIR, fmt='cache', workers=None):
+    """Write every shard of a dataset with a process pool; yields (index, rows, seconds) as shards finish."""
+    if fmt not in FORMATS:
+        raise ValueError(f"format must be one of {FORMATS}, got {fmt!r}")
+    num_shards = -(-rows // shard_rows)
+    with process_pool(workers) as pool:
+        futures = [pool.submit(write_shard, name, rows, i, shard_rows, seed, output_dir, fmt)
+                   for i in range(num_shards)]
+        for future in futures:
+            yield future.result()
+
+
+def iter_shards(name, output_dir=SHARD_DIR):
+    """Yield the shards of a dataset written in 'cache' format, in order, memory-mapped."""
+    directory = os.path.join(output_dir, name)
+    for entry in sorted(os.listdir(directory)):
+        if storage.has_dataset(entry, directory):
+            yield storage.load_dataset(entry, directory)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write a Day5 dataset as deterministic shards.")
+    parser.add_argument('dataset', choices=list(GENERATORS))
+    parser.add_argument('--rows', type=float, default=1e7)
+    parser.add_argument('--shard-rows', type=float, default=1e7, help="rows per shard (bounds memory per worker)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--format', choices=FORMATS, default='cache',
+                        help="'cache' writes storage.py columnar shards, 'csv' one CSV per shard")
+    parser.add_argument('--output-dir', default=SHARD_DIR)
+    args = parser.parse_args(argv)
+
+    rows, shard_rows = int(args.rows), int(args.shard_rows)
+    start = time.perf_counter()
+    written = 0
+    for index, count, seconds in write_dataset(args.dataset, rows, shard_rows, args.seed, args.output_dir,
+                                               args.format, args.workers):
+        written += count
+        print(f"{shard_name(index)}: {count:,} rows in {seconds:.2f} s")
+    elapsed = time.perf_counter() - start
+    print(f"\n{written:,} rows of {args.dataset} written to {os.path.join(args.output_dir, args.dataset)} "
+          f"in {elapsed:.2f} s ({written / elapsed:,.0f} rows/s)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+# Typed, columnar on-disk format for the Day5 datasets.
+# A dataset is a directory with one .npy file per column plus schema.json:
+#   - numeric columns are stored as-is
+#   - datetime columns as int64 ticks (the unit is kept in the schema)
+#   - string/categorical columns as integer codes plus their categories
+# Loading memory-maps the .npy files, so nothing is parsed and the pages are
+# only read when a column is used. CSV stays available as an export.
+
+CACHE_DIR = 'data_cache'
+SCHEMA_FILE = 'schema.json'
+
+
+def dataset_path(name, cache_dir=CACHE_DIR):
+    return os.path.join(cache_dir, name)
+
+
+def save_dataset(df, name, cache_dir=CACHE_DIR, csv_path=None):
+    """Write df to the columnar cache (and optionally export it as CSV)."""
+    path = dataset_path(name, cache_dir)
+    os.makedirs(path, exist_ok=True)
+    schema = []
+    for i, column in enumerate(df.columns):
+        series = df[column]
+        entry = {'name': column, 'file': f'{i}.npy'}
+        if isinstance(series.dtype, pd.CategoricalDtype) or series.dtype == object or pd.api.types.is_string_dtype(series.dtype):
+            categorical = series.astype('category')
+            entry['kind'] = 'category'
+            entry['categories'] = categorical.cat.categories.tolist()
+            values = categorical.cat.codes.to_numpy()
+        elif pd.api.types.is_datetime64_any_dtype(series.dtype):
+            entry['kind'] = 'datetime'
+            entry['unit'] = np.datetime_data(series.dtype)[0]
+            values = series.to_numpy().view(np.int64)
+        else:
+            entry['kind'] = 'numeric'
+            values = series.to_numpy()
+        np.save(os.path.join(path, entry['file']), np.ascontiguousarray(values), allow_pickle=False)
+        schema.append(entry)
+    with open(os.path.join(path, SCHEMA_FILE), 'w') as f:
+        json.dump(schema, f, indent=1)
+    if csv_path is not None:
+        df.to_csv(csv_path, index=False)
+
+
+def load_dataset(name, cache_dir=CACHE_DIR, mmap=True):
+    """Load a dataset written by save_dataset; columns are memory-mapped by default."""
+    path = dataset_path(name, cache_dir)
+    with open(os.path.join(path, SCHEMA_FILE)) as f:
+        schema = json.load(f)
+    columns = {}
+    for entry in schema:
+        values = np.load(os.path.join(path, entry['file']), mmap_mode='r' if mmap else None, allow_pickle=False)
+        if entry['kind'] == 'category':
+            dtype = pd.CategoricalDtype(entry['categories'])
+            columns[entry['name']] = pd.Categorical.from_codes(values, dtype=dtype, validate=False)
+        elif entry['kind'] == 'datetime':
+            columns[entry['name']] = values.view(f"datetime64[{entry['unit']}]")
+        else:
+            columns[entry['name']] = values
+    return pd.DataFrame(columns, copy=False)
+
+
+def has_dataset(name, cache_dir=CACHE_DIR):
+    return os.path.exists(os.path.join(dataset_path(name, cache_dir), SCHEMA_FILE))
@@ -0,0 +1,105 @@
+import numpy as np
+import pandas as pd
+
+from quantile_sketch import KLLSketch
+
+# Running (bounded-memory) statistics that can be fed one chunk at a time.
+# Each accumulator reproduces the columns of pandas' describe():
+# count, mean, std, min, 25%, 50%, 75%, max
+# The quartiles come from a mergeable KLL sketch (see quantile_sketch.py);
+# every other column is exact.
+
+
+class RunningStats:
+    """Count, mean, variance, min/max and quantiles accumulated chunk by chunk.
+
+    Mean and variance are combined with Chan's parallel update, so two
+    accumulators built on different chunks can be merged exactly.
+    """
+
+    def __init__(self, sketch_factory=KLLSketch):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+        self.sketch = sketch_factory()
+
+    def update(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        n = len(values)
+        if n == 0:
+            return
+        mean = values.mean()
+        m2 = ((values - mean) ** 2).sum()
+        self._combine(n, mean, m2, values.min(), values.max())
+        self.sketch.update(values)
+
+    def merge(self, other):
+        if other.count:
+            self._combine(other.count, other.mean, other.m2, other.min, other.max)
+            self.sketch.merge(other.sketch)
+        return self
+
+    def _combine(self, n, mean, m2, vmin, vmax):
+        total = self.count + n
+        delta = mean - self.mean
+        self.mean += delta * n / total
+        self.m2 += m2 + delta ** 2 * self.count * n / total
+        self.count = total
+        self.min = min(self.min, vmin)
+        self.max = max(self.max, vmax)
+
+    @property
+    def std(self):
+        return np.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else np.nan
+
+    def quantiles(self, qs):
+        return np.clip(self.sketch.quantiles(qs), self.min, self.max)
+
+    def quantile(self, q):
+        return float(self.quantiles([q])[0])
+
+    def describe(self):
+        q25, q50, q75 = self.quantiles([0.25, 0.50, 0.75])
+        return pd.Series({
+            'count': float(self.count),
+            'mean': self.mean if self.count else np.nan,
+            'std': self.std,
+            'min': self.min if self.count else np.nan,
+            '25%': q25,
+            '50%': q50,
+            '75%': q75,
+            'max': self.max if self.count else np.nan,
+        })
+
+
+class GroupedRunningStats:
+    """One RunningStats per group key, fed from chunked DataFrames."""
+
+    def __init__(self, sketch_factory=KLLSketch):
+        self.sketch_factory = sketch_factory
+        self.groups = {}
+
+    def update(self, df, by, value_col):
+        for key, values in df.groupby(by, observed=True)[value_col]:
+            if key not in self.groups:
+                self.groups[key] = RunningStats(self.sketch_factory)
+            self.groups[key].update(values.to_numpy())
+
+    def merge(self, other):
+        for key, stats in other.groups.items():
+            if key in self.groups:
+                self.groups[key].merge(stats)
+            else:
+                self.groups[key] = stats
+        return self
+
+    def describe(self, names=None):
+        keys = sorted(self.groups)
+        table = pd.DataFrame([self.groups[k].describe() for k in keys])
+        if keys and isinstance(keys[0], tuple):
+            table.index = pd.MultiIndex.from_tuples(keys, names=names)
+        else:
+            table.index = pd.Index(keys, name=names)
+        return table
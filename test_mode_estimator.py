@@ -0,0 +1,35 @@
+import numpy as np
+
+from mode_estimator import StreamingMode
+
+
+def test_extreme_value_widens_bins_instead_of_allocating():
+    estimator = StreamingMode(bin_width=5)
+    estimator.update([10, 20, 30])
+    estimator.update([5e9])
+    assert len(estimator.counts) <= estimator.max_bins
+    assert estimator.n == 4
+    assert estimator.bin_width >= 5e9 / estimator.max_bins
+
+
+def test_extreme_range_in_one_chunk():
+    estimator = StreamingMode.from_values([0, 1e12], bin_width=0.01)
+    assert len(estimator.counts) <= estimator.max_bins
+    assert estimator.n == 2
+
+
+def test_merge_of_distant_histograms_stays_bounded():
+    a = StreamingMode.from_values([1.0, 2.0, 3.0], bin_width=0.01, max_bins=1024)
+    b = StreamingMode.from_values([1e9], bin_width=0.01, max_bins=1024)
+    a.merge(b)
+    assert len(a.counts) <= 1024
+    assert a.n == 4
+
+
+def test_mode_unchanged_by_a_single_outlier_at_coarse_resolution():
+    rng = np.random.default_rng(0)
+    values = rng.normal(50, 10, 100_000)
+    estimator = StreamingMode.from_values(values, bin_width=1)
+    assert abs(estimator.mode() - 50) < 2
+    estimator.update([np.inf, np.nan])
+    assert estimator.n == 100_000